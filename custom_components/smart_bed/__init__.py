@@ -1,18 +1,66 @@
 """The Smart Bed integration."""
 from __future__ import annotations
 import logging
+import voluptuous as vol
 from homeassistant.components import bluetooth
-from homeassistant.const import Platform
+from homeassistant.const import ATTR_DEVICE_ID, STATE_HOME, STATE_ON, Platform
+from homeassistant.core import Event, HomeAssistant, ServiceCall, callback
 from homeassistant.exceptions import ConfigEntryNotReady
-from homeassistant.helpers import device_registry
-from .const import DOMAIN
+from homeassistant.helpers import config_validation as cv, device_registry
+from homeassistant.helpers.event import async_track_state_change_event
+from .const import (
+    CONF_IDENTITY,
+    CONF_PREWARM,
+    CONF_PREWARM_ENTITIES,
+    CONF_RANGE_DURATION,
+    DATA_MANAGER,
+    DOMAIN,
+    SERVICE_PREWARM,
+    SERVICE_STOP,
+)
 from .smart_bed_device import SmartBedDevice
+from .smart_bed_device.const import MOTOR_COMMANDS
 from .coordinator import SmartBedCoordinator
+from .manager import SmartBedManager
 
-PLATFORMS: list[str] = [Platform.SENSOR, Platform.BUTTON]
+PLATFORMS: list[str] = [Platform.SENSOR, Platform.BUTTON, Platform.COVER, Platform.SELECT, Platform.LIGHT]
 
 _LOGGER = logging.getLogger(__name__)
 
+CONFIG_SCHEMA = cv.config_entry_only_config_schema(DOMAIN)
+
+SERVICE_DEVICE_SCHEMA = vol.Schema({vol.Required(ATTR_DEVICE_ID): vol.All(cv.ensure_list, [cv.string])})
+
+
+def _async_coordinators_from_call(hass: HomeAssistant, call: ServiceCall) -> list[SmartBedCoordinator]:
+    dr = device_registry.async_get(hass)
+    coordinators = []
+    for device_id in call.data[ATTR_DEVICE_ID]:
+        if (device := dr.async_get(device_id)) is None:
+            continue
+        for entry_id in device.config_entries:
+            if coordinator := hass.data.get(DOMAIN, {}).get(entry_id):
+                coordinators.append(coordinator)
+    return coordinators
+
+
+async def async_setup(hass: HomeAssistant, config) -> bool:
+    """Set up the Smart Bed manager and services."""
+    hass.data.setdefault(DOMAIN, {})[DATA_MANAGER] = SmartBedManager(hass)
+
+    async def async_stop(call: ServiceCall) -> None:
+        for coordinator in _async_coordinators_from_call(hass, call):
+            await coordinator.api.stop()
+
+    async def async_prewarm(call: ServiceCall) -> None:
+        # E.g. called by the bed's dashboard when it is opened
+        for coordinator in _async_coordinators_from_call(hass, call):
+            coordinator.async_prewarm("service")
+
+    hass.services.async_register(DOMAIN, SERVICE_STOP, async_stop, schema=SERVICE_DEVICE_SCHEMA)
+    hass.services.async_register(DOMAIN, SERVICE_PREWARM, async_prewarm, schema=SERVICE_DEVICE_SCHEMA)
+    return True
+
 
 async def async_setup_entry(hass, entry) -> bool:
     """Set up Smart Bed device from config entry."""
@@ -23,16 +71,19 @@ async def async_setup_entry(hass, entry) -> bool:
         raise ConfigEntryNotReady(f"Could not find Smart Bed device with address {address}")
 
     smart_bed = SmartBedDevice(_LOGGER, ble_device)
+    entry.async_on_unload(hass.data[DOMAIN][DATA_MANAGER].async_register(smart_bed))
+    for motor in MOTOR_COMMANDS:
+        if duration := entry.options.get(CONF_RANGE_DURATION.format(motor=motor)):
+            smart_bed.set_range_duration(motor, duration)
 
-    # Get device data
-    try:
-        await smart_bed.update_device_data()
-    except Exception as e:
-        raise ConfigEntryNotReady(f"Could not get device data: {e}")
+    # Static device information is cached in the config entry. Without it the
+    # device is registered by address and completed on the first connect.
+    if identity := entry.data.get(CONF_IDENTITY):
+        smart_bed.restore_identity(identity)
 
     # Register device in device registry
-    dr = await device_registry.async_get_registry()
-    await dr.async_get_or_create(
+    dr = device_registry.async_get(hass)
+    dr.async_get_or_create(
         config_entry_id=entry.entry_id,
         # TODO: Add more device metadata, connections={(dr.CONNECTION_NETWORK_MAC, config.mac)},
         identifiers={(DOMAIN, smart_bed.identifier)},
@@ -42,18 +93,73 @@ async def async_setup_entry(hass, entry) -> bool:
         sw_version= smart_bed.sw_version,
     )
 
-    coordinator = SmartBedCoordinator(hass, smart_bed)
-    await coordinator.async_config_entry_first_refresh()
+    def _async_identity_changed(identity: dict[str, str]) -> None:
+        _async_store_identity(hass, entry, identity)
+        dr.async_get_or_create(
+            config_entry_id=entry.entry_id,
+            identifiers={(DOMAIN, smart_bed.identifier)},
+            manufacturer=smart_bed.manufacturer,
+            model=smart_bed.model,
+            sw_version=smart_bed.sw_version,
+        )
+
+    entry.async_on_unload(smart_bed.register_identity_callback(_async_identity_changed))
+
+    coordinator = SmartBedCoordinator(hass, smart_bed, entry.options)
     hass.data.setdefault(DOMAIN, {})[entry.entry_id] = coordinator
 
+    # Advertisements update the entities they can without a connection
+    entry.async_on_unload(bluetooth.async_register_callback(
+        hass,
+        coordinator.async_handle_bluetooth_event,
+        bluetooth.BluetoothCallbackMatcher(address=address),
+        bluetooth.BluetoothScanningMode.PASSIVE,
+    ))
+
+    if entry.options.get(CONF_PREWARM) and (entities := entry.options.get(CONF_PREWARM_ENTITIES)):
+        @callback
+        def _async_trigger_changed(event: Event) -> None:
+            old_state, new_state = event.data["old_state"], event.data["new_state"]
+            if new_state is None or new_state.state not in (STATE_ON, STATE_HOME):
+                return
+            if old_state is None or old_state.state != new_state.state:
+                coordinator.async_prewarm(new_state.entity_id)
+
+        entry.async_on_unload(async_track_state_change_event(hass, entities, _async_trigger_changed))
+
     await hass.config_entries.async_forward_entry_setups(entry, PLATFORMS)
+    entry.async_on_unload(entry.add_update_listener(_async_update_listener))
+
+    # Connect in the background, so startup doesn't wait on the bed's radio
+    entry.async_create_background_task(hass, _async_first_connect(coordinator), f"{DOMAIN} {address} first connect")
 
     return True
 
 
+async def _async_first_connect(coordinator: SmartBedCoordinator) -> None:
+    """Read the initial state, then subscribe to the characteristics the bed pushes."""
+    await coordinator.async_refresh()
+    await coordinator.async_start_push()
+
+
+async def _async_update_listener(hass, entry) -> None:
+    """Reload the entry when its options changed."""
+    # Data updates, like a newly read identity, don't need a reload
+    coordinator: SmartBedCoordinator | None = hass.data[DOMAIN].get(entry.entry_id)
+    if coordinator is not None and coordinator.options == entry.options:
+        return
+    await hass.config_entries.async_reload(entry.entry_id)
+
+
+def _async_store_identity(hass, entry, identity: dict[str, str]) -> None:
+    if entry.data.get(CONF_IDENTITY) != identity:
+        hass.config_entries.async_update_entry(entry, data={**entry.data, CONF_IDENTITY: identity})
+
+
 async def async_unload_entry(hass, entry) -> bool:
     """Unload a config entry."""
     if unload_ok := await hass.config_entries.async_unload_platforms(entry, PLATFORMS):
-        hass.data[DOMAIN].pop(entry.entry_id)
+        coordinator: SmartBedCoordinator = hass.data[DOMAIN].pop(entry.entry_id)
+        await coordinator.async_shutdown()
 
     return unload_ok
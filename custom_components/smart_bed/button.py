@@ -1,104 +1,87 @@
 """Platform for button integration."""
 from __future__ import annotations
 import logging
-from homeassistant.components.button import ButtonEntity
-from .const import DOMAIN
-from .smart_bed_device import SmartBedDevice
+from collections.abc import Awaitable, Callable
+from dataclasses import dataclass
+from homeassistant.components.button import ButtonEntity, ButtonEntityDescription
+from homeassistant.util import slugify
+from .const import CONF_PRESETS, CONF_PROGRAMS, DEFAULT_PRESETS, DOMAIN
 from .coordinator import SmartBedCoordinator
+from .entity import SmartBedEntity
+from .smart_bed_device import MotionProgram, SmartBedDevice, SmartBedProgramError, parse_program
 
 _LOGGER = logging.getLogger(__name__)
 
 
-async def async_setup_entry(hass, config_entry, async_add_entities):
-    """Add sensors for passed config_entry in HA."""
-    coordinator: SmartBedCoordinator = hass.data[DOMAIN][config_entry.entry_id]
-
-    async_add_entities([
-        StartWaveButton(coordinator.api)
-    ])
-
-
-class ButtonBase(ButtonEntity):
-    def __init__(self, device: SmartBedDevice):
-        self._device = device
-
-    @property
-    def device_info(self):
-        """Return information to link this entity with the correct device."""
-        return {"identifiers": {(DOMAIN, self._device.identifier)}}
-
-
-class DownButton(ButtonBase):
-    def __init__(self, device: SmartBedDevice):
-        super().__init__(device)
-        self._attr_unique_id = f"{self._device.identifier}_down_button"
-        self._attr_name = f"{self._device.name} Down Button"
-
-    async def async_press(self) -> None:
-        _LOGGER.debug("Pressed button")
-        await self._device.down()
-
+@dataclass(frozen=True, kw_only=True)
+class SmartBedButtonEntityDescription(ButtonEntityDescription):
+    """Describes a Smart Bed button and the device action it triggers."""
+    press_fn: Callable[[SmartBedDevice], Awaitable[None]]
 
-class UpButton(ButtonBase):
-    def __init__(self, device: SmartBedDevice):
-        super().__init__(device)
-        self._attr_unique_id = f"{self._device.identifier}_up_button"
-        self._attr_name = f"{self._device.name} Up Button"
 
-    async def async_press(self) -> None:
-        _LOGGER.debug("Pressed button")
-        await self._device.up()
+BUTTONS: tuple[SmartBedButtonEntityDescription, ...] = (
+    SmartBedButtonEntityDescription(key="down", name="Down Button", press_fn=lambda device: device.down()),
+    SmartBedButtonEntityDescription(key="up", name="Up Button", press_fn=lambda device: device.up()),
+    SmartBedButtonEntityDescription(key="head_down", name="Head Down Button", press_fn=lambda device: device.head_down()),
+    SmartBedButtonEntityDescription(key="head_up", name="Head Up Button", press_fn=lambda device: device.head_up()),
+    SmartBedButtonEntityDescription(key="legs_down", name="Legs Down Button", press_fn=lambda device: device.legs_down()),
+    SmartBedButtonEntityDescription(key="legs_up", name="Legs Up Button", press_fn=lambda device: device.legs_up()),
+    SmartBedButtonEntityDescription(key="start_wave", name="Start Wave Button", press_fn=lambda device: device.start_wave()),
+    SmartBedButtonEntityDescription(key="stop", name="Stop Button", press_fn=lambda device: device.stop()),
+)
 
 
-class HeadDownButton(ButtonBase):
-    def __init__(self, device: SmartBedDevice):
-        super().__init__(device)
-        self._attr_unique_id = f"{self._device.identifier}_head_down_button"
-        self._attr_name = f"{self._device.name} Head Down Button"
+def _preset_description(preset: str, positions: dict[str, float]) -> SmartBedButtonEntityDescription:
+    return SmartBedButtonEntityDescription(
+        key=f"preset_{slugify(preset)}",
+        name=f"{preset} Preset Button",
+        press_fn=lambda device: device.set_positions(positions),
+    )
 
-    async def async_press(self) -> None:
-        _LOGGER.debug("Pressed button")
-        await self._device.head_down()
 
+def _program_description(program: MotionProgram) -> SmartBedButtonEntityDescription:
+    return SmartBedButtonEntityDescription(
+        key=f"program_{slugify(program.name)}",
+        name=f"{program.name} Program Button",
+        press_fn=lambda device: device.run_program(program),
+    )
 
-class HeadUpButton(ButtonBase):
-    def __init__(self, device: SmartBedDevice):
-        super().__init__(device)
-        self._attr_unique_id = f"{self._device.identifier}_head_up_button"
-        self._attr_name = f"{self._device.name} Head Up Button"
 
-    async def async_press(self) -> None:
-        _LOGGER.debug("Pressed button")
-        await self._device.head_up()
+def _load_programs(definitions: dict) -> list[MotionProgram]:
+    programs = []
+    for name, definition in definitions.items():
+        try:
+            programs.append(parse_program(name, definition))
+        except SmartBedProgramError as err:
+            _LOGGER.warning("Skipping motion program %s: %s", name, err)
+    return programs
 
 
-class LegsDownButton(ButtonBase):
-    def __init__(self, device: SmartBedDevice):
-        super().__init__(device)
-        self._attr_unique_id = f"{self._device.identifier}_legs_down_button"
-        self._attr_name = f"{self._device.name} Legs Down Button"
+async def async_setup_entry(hass, config_entry, async_add_entities):
+    """Add buttons for passed config_entry in HA."""
+    coordinator: SmartBedCoordinator = hass.data[DOMAIN][config_entry.entry_id]
+    presets = config_entry.options.get(CONF_PRESETS, DEFAULT_PRESETS)
+    programs = _load_programs(config_entry.options.get(CONF_PROGRAMS, {}))
 
-    async def async_press(self) -> None:
-        _LOGGER.debug("Pressed button")
-        await self._device.legs_down()
+    async_add_entities(
+        SmartBedButton(coordinator.api, description)
+        for description in (
+            *BUTTONS,
+            *(_preset_description(preset, positions) for preset, positions in presets.items()),
+            *(_program_description(program) for program in programs),
+        )
+    )
 
 
-class LegsUpButton(ButtonBase):
-    def __init__(self, device: SmartBedDevice):
-        super().__init__(device)
-        self._attr_unique_id = f"{self._device.identifier}_legs_up_button"
-        self._attr_name = f"{self._device.name} Legs Up Button"
+class SmartBedButton(SmartBedEntity, ButtonEntity):
+    entity_description: SmartBedButtonEntityDescription
 
-    async def async_press(self) -> None:
-        _LOGGER.debug("Pressed button")
-        await self._device.legs_up()
-        
-class StartWaveButton(ButtonBase):
-    def __init__(self, device: SmartBedDevice):
+    def __init__(self, device: SmartBedDevice, description: SmartBedButtonEntityDescription):
         super().__init__(device)
-        self._attr_unique_id = f"{self._device.identifier}_start_wave_button"
-        self._attr_name = f"{self._device.name} Start Wave Button"
+        self.entity_description = description
+        self._attr_unique_id = f"{self._device.identifier}_{description.key}_button"
+        self._attr_name = f"{self._device.name} {description.name}"
 
     async def async_press(self) -> None:
-        _LOGGER.debug("Pressed button")
-        await self._device.start_wave()
+        _LOGGER.debug("Pressed %s button", self.entity_description.key)
+        await self.entity_description.press_fn(self._device)
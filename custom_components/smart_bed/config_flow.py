@@ -1,10 +1,12 @@
 from __future__ import annotations
 
+import asyncio
 import logging
 from typing import Any
 
-from .smart_bed_device import SmartBedDevice
+from .smart_bed_device import SmartBedDevice, SmartBedProgramError, parse_advertisement, parse_program
 from bleak import BleakError
+import async_timeout
 import voluptuous as vol
 
 from homeassistant.components import bluetooth
@@ -12,11 +14,38 @@ from homeassistant.components.bluetooth import (
     BluetoothServiceInfo,
     async_discovered_service_info,
 )
-from homeassistant.config_entries import ConfigFlow
-from homeassistant.const import CONF_ADDRESS
+from homeassistant.config_entries import ConfigEntry, ConfigFlow, OptionsFlow, OptionsFlowWithConfigEntry
+from homeassistant.core import callback
+from homeassistant.const import CONF_ADDRESS, CONF_NAME
 from homeassistant.data_entry_flow import FlowResult
+from homeassistant.helpers import config_validation as cv
+from homeassistant.helpers.selector import EntitySelector, EntitySelectorConfig, ObjectSelector
 
-from .const import DOMAIN
+from .const import (
+    CONF_FAST_INTERVAL,
+    CONF_IDENTITY,
+    CONF_IDLE_INTERVAL,
+    CONF_MAX_INTERVAL,
+    CONF_PRESETS,
+    CONF_PREWARM,
+    CONF_PREWARM_ENTITIES,
+    CONF_PREWARM_WINDOW,
+    CONF_PROGRAMS,
+    CONF_RANGE_DURATION,
+    CONF_REPEAT,
+    CONF_SETTLE_TIME,
+    CONF_STEPS,
+    DEFAULT_FAST_INTERVAL,
+    DEFAULT_IDLE_INTERVAL,
+    DEFAULT_MAX_INTERVAL,
+    DEFAULT_PRESETS,
+    DEFAULT_PREWARM_WINDOW,
+    DEFAULT_SETTLE_TIME,
+    DOMAIN,
+    PROBE_CONCURRENCY,
+    PROBE_TIMEOUT,
+)
+from .smart_bed_device.const import MOTOR_COMMANDS, MOTOR_RANGE_DURATIONS
 
 _LOGGER = logging.getLogger(__name__)
 
@@ -33,6 +62,14 @@ class SmartBedConfigFlow(ConfigFlow, domain=DOMAIN):
 
     def __init__(self) -> None:
         self._discovered_devices: dict[str, SmartBedDevice] = {}
+        self._advertised_names: dict[str, str] = {}
+        self._probes: dict[str, asyncio.Task[SmartBedDevice | None]] = {}
+        self._probe_semaphore = asyncio.Semaphore(PROBE_CONCURRENCY)
+
+    @staticmethod
+    @callback
+    def async_get_options_flow(config_entry: ConfigEntry) -> OptionsFlow:
+        return SmartBedOptionsFlow(config_entry)
 
     async def _get_device_data(self, discovery_info: BluetoothServiceInfo) -> SmartBedDevice:
         ble_device = bluetooth.async_ble_device_from_address(self.hass, discovery_info.address, connectable=True)
@@ -43,7 +80,7 @@ class SmartBedConfigFlow(ConfigFlow, domain=DOMAIN):
         smart_bed = SmartBedDevice(_LOGGER, ble_device)
 
         try:
-            await smart_bed.update_device_data()
+            await smart_bed.update_device_info()
         except BleakError as err:
             _LOGGER.error("Error connecting to and getting data from %s: %s",
                 discovery_info.address,err,)
@@ -51,9 +88,23 @@ class SmartBedConfigFlow(ConfigFlow, domain=DOMAIN):
         except Exception as err:
             _LOGGER.error("Unknown error occurred from %s: %s", discovery_info.address, err)
             raise err
-        
+        finally:
+            await smart_bed.disconnect()
+
         return smart_bed
 
+    async def _probe_device(self, discovery_info: BluetoothServiceInfo) -> SmartBedDevice | None:
+        """Read the device information, or return None if the device couldn't be reached in time."""
+        async with self._probe_semaphore:
+            try:
+                async with async_timeout.timeout(PROBE_TIMEOUT):
+                    return await self._get_device_data(discovery_info)
+            except asyncio.TimeoutError:
+                _LOGGER.warning("Timed out probing %s", discovery_info.address)
+            except Exception as err:
+                _LOGGER.debug("Could not probe %s: %s", discovery_info.address, err)
+        return None
+
     async def async_step_bluetooth(self, discovery_info: BluetoothServiceInfo) -> FlowResult:
         """Handle a flow initialized by discovery over Bluetooth."""
         _LOGGER.debug("Discovered BT device: %s", discovery_info)
@@ -68,14 +119,17 @@ class SmartBedConfigFlow(ConfigFlow, domain=DOMAIN):
             return self.async_abort(reason="unknown")
 
         self.context["title_placeholders"] = {"name": device.name}
+        self._discovered_devices[discovery_info.address] = device
 
         return await self.async_step_bluetooth_confirm()
 
     async def async_step_bluetooth_confirm(self, user_input: dict[str, Any] | None = None) -> FlowResult:
         """Handle the Bluetooth confirmation step."""
         if user_input is not None:
+            device = self._discovered_devices[self.unique_id]
             return self.async_create_entry(
-                title=self.context["title_placeholders"]["name"], data={}
+                title=self.context["title_placeholders"]["name"],
+                data={CONF_IDENTITY: device.identity},
             )
 
         self._set_confirm_only()
@@ -90,24 +144,35 @@ class SmartBedConfigFlow(ConfigFlow, domain=DOMAIN):
             address = user_input[CONF_ADDRESS]
             await self.async_set_unique_id(address, raise_on_progress=False)
             self._abort_if_unique_id_configured()
-            device = self._discovered_devices[address]
+            name = self._advertised_names[address]
+            # A bed whose probe finished is set up with its identity, the
+            # identity of any other is read on the first connect after setup
+            probe = self._probes.get(address)
+            device = probe.result() if probe is not None and probe.done() and not probe.cancelled() else None
+            data = {CONF_IDENTITY: device.identity} if device is not None else {}
 
             self.context["title_placeholders"] = {
-                "name": device.name,
+                "name": name,
             }
 
-            return self.async_create_entry(title=device.name, data={})
+            return self.async_create_entry(title=name, data=data)
 
         current_addresses = self._async_current_ids()
+        candidates: list[BluetoothServiceInfo] = []
         for discovery_info in async_discovered_service_info(self.hass):
             address = discovery_info.address
-            if address in current_addresses or address in self._discovered_devices:
+            if address in current_addresses:
                 continue
 
             if discovery_info.advertisement.local_name is None:
                 continue
 
-            if not discovery_info.manufacturer_id == 944:
+            if parse_advertisement(
+                address,
+                discovery_info.name,
+                discovery_info.rssi,
+                discovery_info.manufacturer_data,
+            ) is None:
                 continue
 
             _LOGGER.debug("Found Smart Bed device")
@@ -119,26 +184,150 @@ class SmartBedConfigFlow(ConfigFlow, domain=DOMAIN):
             _LOGGER.debug("Smart Bed service uuids: %s", discovery_info.service_uuids)
             _LOGGER.debug("Smart Bed rssi: %s", discovery_info.rssi)
             _LOGGER.debug("Smart Bed local name: %s", discovery_info.advertisement.local_name)
-            try:
-                device = await self._get_device_data(discovery_info)
-            except SmartBedDeviceError:
-                return self.async_abort(reason="cannot_connect")
-            except Exception:
-                return self.async_abort(reason="unknown")
-            self._discovered_devices[address] = device
-
-        if not self._discovered_devices:
+            candidates.append(discovery_info)
+
+        if not candidates:
             return self.async_abort(reason="no_devices_found")
 
-        titles = {
-            address: device.name
-            for (address, device) in self._discovered_devices.items()
-        }
+        # The form lists the advertised names right away, the identities are
+        # read in the background while the user picks a bed
+        for discovery_info in candidates:
+            self._advertised_names[discovery_info.address] = discovery_info.name
+            if discovery_info.address not in self._probes:
+                self._probes[discovery_info.address] = self.hass.async_create_background_task(
+                    self._probe_device(discovery_info), f"{DOMAIN} probe {discovery_info.address}"
+                )
         return self.async_show_form(
             step_id="user",
             data_schema=vol.Schema(
                 {
-                    vol.Required(CONF_ADDRESS): vol.In(titles),
+                    vol.Required(CONF_ADDRESS): vol.In(self._advertised_names),
                 },
             ),
-        )
\ No newline at end of file
+        )
+
+    @callback
+    def async_remove(self) -> None:
+        """Stop the probes that are still running when the flow ends."""
+        for probe in self._probes.values():
+            probe.cancel()
+
+
+class SmartBedOptionsFlow(OptionsFlowWithConfigEntry):
+    """Handle the Smart Bed options."""
+
+    async def async_step_init(self, user_input: dict[str, Any] | None = None) -> FlowResult:
+        """Choose which options to change."""
+        return self.async_show_menu(step_id="init", menu_options=[
+            "calibration", "polling", "prewarm", "preset", "remove_preset", "program", "remove_program",
+        ])
+
+    async def async_step_calibration(self, user_input: dict[str, Any] | None = None) -> FlowResult:
+        """Calibrate the full-range run time of the motors."""
+        if user_input is not None:
+            return self.async_create_entry(title="", data={**self.config_entry.options, **user_input})
+
+        options = self.config_entry.options
+        schema = {}
+        for motor in MOTOR_COMMANDS:
+            key = CONF_RANGE_DURATION.format(motor=motor)
+            schema[vol.Required(key, default=options.get(key, MOTOR_RANGE_DURATIONS[motor]))] = vol.All(
+                vol.Coerce(float), vol.Range(min=1, max=120)
+            )
+        return self.async_show_form(step_id="calibration", data_schema=vol.Schema(schema))
+
+    async def async_step_polling(self, user_input: dict[str, Any] | None = None) -> FlowResult:
+        """Tune how often the bed is polled while moving and while idle."""
+        if user_input is not None:
+            return self.async_create_entry(title="", data={**self.config_entry.options, **user_input})
+
+        options = self.config_entry.options
+        schema = {}
+        for key, default, maximum in (
+            (CONF_FAST_INTERVAL, DEFAULT_FAST_INTERVAL, 60),
+            (CONF_SETTLE_TIME, DEFAULT_SETTLE_TIME, 300),
+            (CONF_IDLE_INTERVAL, DEFAULT_IDLE_INTERVAL, 3600),
+            (CONF_MAX_INTERVAL, DEFAULT_MAX_INTERVAL, 86400),
+        ):
+            schema[vol.Required(key, default=options.get(key, default))] = vol.All(
+                vol.Coerce(float), vol.Range(min=0.5, max=maximum)
+            )
+        return self.async_show_form(step_id="polling", data_schema=vol.Schema(schema))
+
+    async def async_step_prewarm(self, user_input: dict[str, Any] | None = None) -> FlowResult:
+        """Choose when to connect ahead of an expected command."""
+        if user_input is not None:
+            return self.async_create_entry(title="", data={**self.config_entry.options, **user_input})
+
+        options = self.config_entry.options
+        return self.async_show_form(
+            step_id="prewarm",
+            data_schema=vol.Schema({
+                vol.Required(CONF_PREWARM, default=options.get(CONF_PREWARM, False)): bool,
+                vol.Required(CONF_PREWARM_WINDOW, default=options.get(CONF_PREWARM_WINDOW, DEFAULT_PREWARM_WINDOW)):
+                    vol.All(vol.Coerce(float), vol.Range(min=5, max=600)),
+                vol.Optional(CONF_PREWARM_ENTITIES, default=options.get(CONF_PREWARM_ENTITIES, [])):
+                    EntitySelector(EntitySelectorConfig(multiple=True)),
+            }),
+        )
+
+    async def async_step_preset(self, user_input: dict[str, Any] | None = None) -> FlowResult:
+        """Add or replace a preset of motor positions."""
+        if user_input is not None:
+            name = user_input.pop(CONF_NAME)
+            presets = {**self.config_entry.options.get(CONF_PRESETS, DEFAULT_PRESETS), name: user_input}
+            return self.async_create_entry(title="", data={**self.config_entry.options, CONF_PRESETS: presets})
+
+        schema = {vol.Required(CONF_NAME): cv.string}
+        for motor in MOTOR_COMMANDS:
+            schema[vol.Optional(motor)] = vol.All(vol.Coerce(float), vol.Range(min=0, max=100))
+        return self.async_show_form(step_id="preset", data_schema=vol.Schema(schema))
+
+    async def async_step_remove_preset(self, user_input: dict[str, Any] | None = None) -> FlowResult:
+        """Remove a preset."""
+        presets = dict(self.config_entry.options.get(CONF_PRESETS, DEFAULT_PRESETS))
+        if user_input is not None:
+            presets.pop(user_input[CONF_NAME], None)
+            return self.async_create_entry(title="", data={**self.config_entry.options, CONF_PRESETS: presets})
+
+        return self.async_show_form(
+            step_id="remove_preset",
+            data_schema=vol.Schema({vol.Required(CONF_NAME): vol.In(list(presets))}),
+        )
+
+    async def async_step_program(self, user_input: dict[str, Any] | None = None) -> FlowResult:
+        """Add or replace a motion program."""
+        errors = {}
+        if user_input is not None:
+            name = user_input[CONF_NAME]
+            definition = {CONF_STEPS: user_input[CONF_STEPS], CONF_REPEAT: user_input[CONF_REPEAT]}
+            try:
+                parse_program(name, definition)
+            except SmartBedProgramError as err:
+                _LOGGER.debug("Invalid motion program %s: %s", name, err)
+                errors[CONF_STEPS] = "invalid_program"
+            else:
+                programs = {**self.config_entry.options.get(CONF_PROGRAMS, {}), name: definition}
+                return self.async_create_entry(title="", data={**self.config_entry.options, CONF_PROGRAMS: programs})
+
+        return self.async_show_form(
+            step_id="program",
+            data_schema=vol.Schema({
+                vol.Required(CONF_NAME): cv.string,
+                vol.Required(CONF_REPEAT, default=1): vol.All(vol.Coerce(int), vol.Range(min=1, max=100)),
+                vol.Required(CONF_STEPS): ObjectSelector(),
+            }),
+            errors=errors,
+        )
+
+    async def async_step_remove_program(self, user_input: dict[str, Any] | None = None) -> FlowResult:
+        """Remove a motion program."""
+        programs = dict(self.config_entry.options.get(CONF_PROGRAMS, {}))
+        if user_input is not None:
+            programs.pop(user_input[CONF_NAME], None)
+            return self.async_create_entry(title="", data={**self.config_entry.options, CONF_PROGRAMS: programs})
+
+        return self.async_show_form(
+            step_id="remove_program",
+            data_schema=vol.Schema({vol.Required(CONF_NAME): vol.In(list(programs))}),
+        )
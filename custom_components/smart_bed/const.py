@@ -1,4 +1,64 @@
 """Constants"""
+from .smart_bed_device.const import MOTOR_BED, MOTOR_HEAD, MOTOR_LEGS
 
 DOMAIN = "smart_bed"
-DEFAULT_UPDATE_INTERVAL = 600
\ No newline at end of file
+DEFAULT_UPDATE_INTERVAL = 600
+
+# Adaptive polling options, all in seconds
+CONF_FAST_INTERVAL = "fast_interval"
+CONF_SETTLE_TIME = "settle_time"
+CONF_IDLE_INTERVAL = "idle_interval"
+CONF_MAX_INTERVAL = "max_interval"
+DEFAULT_FAST_INTERVAL = 1
+DEFAULT_SETTLE_TIME = 5
+DEFAULT_IDLE_INTERVAL = 30
+DEFAULT_MAX_INTERVAL = DEFAULT_UPDATE_INTERVAL
+
+DATA_MANAGER = "manager"
+
+# Smallest change of a state field that is written to its entity. The chip
+# temperature is decoded in whole degrees, so any change is worth showing.
+FIELD_DEADBANDS: dict[str, float] = {}
+# Minimum seconds between two writes of a state field
+FIELD_MIN_INTERVALS = {"chip_temp": 60}
+
+# Concurrent connect attempts per Bluetooth adapter
+MAX_CONNECTS_PER_ADAPTER = 2
+# Seconds between background connects on the same adapter
+POLL_STAGGER = 2
+
+# Devices probed at once while setting up, and seconds each probe may take
+PROBE_CONCURRENCY = 3
+PROBE_TIMEOUT = 20
+CONF_IDENTITY = "identity"
+
+# Options holding the measured full-range run time of each motor, in seconds
+CONF_RANGE_DURATION = "{motor}_range_duration"
+
+# Option holding named presets, each mapping motors to a position in percent
+CONF_PRESETS = "presets"
+DEFAULT_PRESETS = {
+    "Flat": {MOTOR_BED: 0, MOTOR_HEAD: 0, MOTOR_LEGS: 0},
+    "Reading": {MOTOR_HEAD: 60, MOTOR_LEGS: 20},
+    "Zero G": {MOTOR_HEAD: 30, MOTOR_LEGS: 45},
+}
+
+# Option holding named motion programs, in the format of smart_bed_device.parse_program
+CONF_PROGRAMS = "programs"
+CONF_REPEAT = "repeat"
+CONF_STEPS = "steps"
+
+# Opt-in connecting ahead of expected commands, on bed activity or when one of
+# the trigger entities turns on or home. The warm link is kept for the window.
+CONF_PREWARM = "prewarm"
+CONF_PREWARM_WINDOW = "prewarm_window"
+CONF_PREWARM_ENTITIES = "prewarm_entities"
+DEFAULT_PREWARM_WINDOW = 60
+# Seconds between prewarms triggered by advertisements
+PREWARM_COOLDOWN = 120
+
+SERVICE_STOP = "stop"
+SERVICE_PREWARM = "prewarm"
+
+# Seconds light changes are collected before the last one is written
+LIGHT_DEBOUNCE = 0.25
\ No newline at end of file
@@ -1,23 +1,220 @@
 import logging
+import time
 from datetime import timedelta
+from typing import Any
+from homeassistant.components.bluetooth import BluetoothChange, BluetoothServiceInfoBleak
+from homeassistant.core import callback
+from homeassistant.helpers.event import async_call_later
 from homeassistant.helpers.update_coordinator import DataUpdateCoordinator, UpdateFailed
 import async_timeout
-from .const import DOMAIN, DEFAULT_UPDATE_INTERVAL
-from .smart_bed_device import SmartBedDevice
+from .const import (
+    DOMAIN,
+    CONF_FAST_INTERVAL,
+    CONF_IDLE_INTERVAL,
+    CONF_MAX_INTERVAL,
+    CONF_PREWARM,
+    CONF_PREWARM_WINDOW,
+    CONF_SETTLE_TIME,
+    DEFAULT_FAST_INTERVAL,
+    DEFAULT_IDLE_INTERVAL,
+    DEFAULT_MAX_INTERVAL,
+    DEFAULT_PREWARM_WINDOW,
+    DEFAULT_SETTLE_TIME,
+    FIELD_DEADBANDS,
+    FIELD_MIN_INTERVALS,
+    PREWARM_COOLDOWN,
+)
+from .smart_bed_device import SmartBedDevice, SmartBedState, parse_advertisement
 
 _LOGGER = logging.getLogger(__name__)
 
 
-class SmartBedCoordinator(DataUpdateCoordinator):
-    """ Smart Bed data update coordinator. """
-    def __init__(self, hass, api: SmartBedDevice):
+class SmartBedCoordinator(DataUpdateCoordinator[SmartBedState]):
+    """ Smart Bed data update coordinator.
+
+    Entities that listen with a state field as context are only called when
+    that field changed by more than its deadband, and at most once per its
+    minimum interval. Entities without a context are called on every update.
+
+    The poll interval adapts: it is `fast_interval` while a motor moves and
+    for `settle_time` after, and otherwise starts at `idle_interval` and
+    doubles up to `max_interval` for every poll that brings no change or
+    fails.
+
+    With pre-warming enabled, changing advertisements connect ahead of the
+    command they likely precede, and the link is kept for `prewarm_window`.
+    """
+    def __init__(self, hass, api: SmartBedDevice,
+                 options: dict[str, Any] | None = None,
+                 deadbands: dict[str, float] | None = None,
+                 min_intervals: dict[str, float] | None = None):
+        options = options or {}
         super().__init__(
             hass,
             _LOGGER,
             name=DOMAIN,
-            update_interval=timedelta(seconds=DEFAULT_UPDATE_INTERVAL),
+            update_interval=timedelta(seconds=options.get(CONF_IDLE_INTERVAL, DEFAULT_IDLE_INTERVAL)),
         )
         self.api = api
+        self.options = dict(options)
+        self.fast_interval = timedelta(seconds=options.get(CONF_FAST_INTERVAL, DEFAULT_FAST_INTERVAL))
+        self.settle_time = options.get(CONF_SETTLE_TIME, DEFAULT_SETTLE_TIME)
+        self.idle_interval = timedelta(seconds=options.get(CONF_IDLE_INTERVAL, DEFAULT_IDLE_INTERVAL))
+        self.max_interval = timedelta(seconds=options.get(CONF_MAX_INTERVAL, DEFAULT_MAX_INTERVAL))
+        self._backoff_interval = self.idle_interval
+        self._last_motion: float | None = None
+        self.deadbands = FIELD_DEADBANDS if deadbands is None else deadbands
+        self.min_intervals = FIELD_MIN_INTERVALS if min_intervals is None else min_intervals
+        self._published: dict[str, tuple[Any, float]] = {}
+        self._published_success: bool | None = None
+        self._unsub_flush = None
+        self._unsub_device = api.register_callback(self._handle_device_update)
+        self.prewarm_enabled: bool = options.get(CONF_PREWARM, False)
+        self.prewarm_window: float = options.get(CONF_PREWARM_WINDOW, DEFAULT_PREWARM_WINDOW)
+        self._last_prewarm: float | None = None
+        self._prewarm_task = None
+        self._push_pending: bool = False
+        self._push_task = None
+
+    @callback
+    def async_update_listeners(self) -> None:
+        """Update the listeners of changed fields and those without a field."""
+        if availability_changed := self.last_update_success != self._published_success:
+            self._published_success = self.last_update_success
+        changed = self._async_changed_fields()
+        for update_callback, context in list(self._listeners.values()):
+            if context is None or availability_changed or context in changed:
+                update_callback()
+
+    @callback
+    def _async_changed_fields(self) -> set[str]:
+        if self.data is None:
+            return set()
+        now = time.monotonic()
+        changed = set()
+        delay = None
+        for context in {context for _, context in self._listeners.values() if context is not None}:
+            value = getattr(self.data, context)
+            if context in self._published:
+                published, published_at = self._published[context]
+                if value == published:
+                    continue
+                deadband = self.deadbands.get(context)
+                if (deadband and value is not None and published is not None
+                        and abs(value - published) < deadband):
+                    continue
+                wait = published_at + self.min_intervals.get(context, 0) - now
+                if wait > 0:
+                    delay = wait if delay is None else min(delay, wait)
+                    continue
+            self._published[context] = (value, now)
+            changed.add(context)
+        if delay is not None and self._unsub_flush is None:
+            # Publish what was held back once the minimum interval has passed
+            self._unsub_flush = async_call_later(self.hass, delay, self._async_flush)
+        return changed
+
+    @callback
+    def _async_flush(self, _now) -> None:
+        self._unsub_flush = None
+        self.async_update_listeners()
+
+    async def async_start_push(self):
+        """Switch to notifications for every state characteristic the firmware can push.
+
+        Characteristics that can't be notified keep being polled. If the bed
+        can't be reached, this is tried again after the next successful poll.
+        """
+        self._push_pending = True
+        try:
+            pushed = await self.api.start_notify()
+        except Exception as err:
+            _LOGGER.warning("Notifications unavailable for %s, polling instead: %s", self.api.name, err)
+            return
+        self._push_pending = False
+        _LOGGER.debug("%s pushes %d state characteristics", self.api.name, len(pushed))
+
+    async def async_shutdown(self) -> None:
+        """Stop notifications and release the device connection."""
+        await super().async_shutdown()
+        if self._unsub_flush is not None:
+            self._unsub_flush()
+            self._unsub_flush = None
+        self._unsub_device()
+        self._push_pending = False
+        for task in (self._prewarm_task, self._push_task):
+            if task is not None:
+                task.cancel()
+        await self.api.disconnect()
+
+    @callback
+    def async_handle_bluetooth_event(self, service_info: BluetoothServiceInfoBleak, change: BluetoothChange) -> None:
+        """Update entities from an advertisement, without connecting."""
+        advertisement = parse_advertisement(
+            service_info.address,
+            service_info.name,
+            service_info.rssi,
+            service_info.manufacturer_data,
+        )
+        if advertisement is None:
+            return
+        if self.api.update_from_advertisement(advertisement, service_info.device):
+            self.async_update_listeners()
+            # Changing advertisements mean someone uses the bed, e.g. with its remote
+            if self.prewarm_enabled:
+                self.async_prewarm("advertisement", PREWARM_COOLDOWN)
+        # An unavailable bed that is heard again is probed without waiting for the full backoff
+        if self.api.health.is_open and self.api.health.probe_now():
+            self.hass.async_create_task(self.async_request_refresh())
+
+    @callback
+    def async_prewarm(self, reason: str, cooldown: float = 0) -> None:
+        """Connect in the background ahead of an expected command.
+
+        Nothing is done while connected, while a prewarm is running, or
+        within `cooldown` seconds of the last prewarm.
+        """
+        if self.api.connection.is_connected or (self._prewarm_task is not None and not self._prewarm_task.done()):
+            return
+        now = time.monotonic()
+        if cooldown and self._last_prewarm is not None and now - self._last_prewarm < cooldown:
+            return
+        self._last_prewarm = now
+        self._prewarm_task = self.hass.async_create_background_task(
+            self._async_prewarm(reason), f"{DOMAIN} {self.api.address} prewarm"
+        )
+
+    async def _async_prewarm(self, reason: str) -> None:
+        try:
+            if await self.api.connection.prewarm(self.prewarm_window):
+                _LOGGER.debug("%s: prewarmed the connection (%s)", self.api.name, reason)
+        except Exception as err:
+            _LOGGER.debug("%s: prewarm failed: %s", self.api.name, err)
+
+    def _handle_device_update(self):
+        if self.api.executor.active_motors:
+            # Poll fast while moving, the new interval applies when the update reschedules
+            self._last_motion = time.monotonic()
+            self.update_interval = self.fast_interval
+        if not self.last_update_success:
+            # Local changes, e.g. a failed program clearing its progress, don't
+            # show that the bed is reachable again; the next poll decides that
+            self.data = self.api.state
+            self.async_update_listeners()
+            return
+        self.async_set_updated_data(self.api.state)
+
+    def _async_adapt_interval(self, changed: bool, failed: bool = False) -> None:
+        if self.api.executor.active_motors:
+            self._last_motion = time.monotonic()
+        if self._last_motion is not None and time.monotonic() - self._last_motion < self.settle_time:
+            self.update_interval = self.fast_interval
+            return
+        if changed and not failed:
+            self._backoff_interval = self.idle_interval
+        else:
+            self._backoff_interval = min(self._backoff_interval * 2, self.max_interval)
+        self.update_interval = self._backoff_interval
 
     async def _async_update_data(self):
         """Fetch data from API endpoint."""
@@ -25,6 +222,17 @@ class SmartBedCoordinator(DataUpdateCoordinator):
             # Note: asyncio.TimeoutError and aiohttp.ClientError are already
             # handled by the data update coordinator.
             async with async_timeout.timeout(20):
-                return await self.api.update_device_data()
+                # Only read what enabled entities show, everything before they are added
+                fields = {context for context in self.async_contexts() if context is not None}
+                await self.api.update_device_data(fields or None)
         except Exception as err:
-            raise UpdateFailed(f"Unable to fetch data: {err}")
\ No newline at end of file
+            self._async_adapt_interval(changed=False, failed=True)
+            raise UpdateFailed(f"Unable to fetch data: {err}")
+        state = self.api.state
+        self._async_adapt_interval(changed=state != self.data)
+        if self._push_pending and (self._push_task is None or self._push_task.done()):
+            # The bed is reachable again, retry the subscriptions that failed
+            self._push_task = self.hass.async_create_background_task(
+                self.async_start_push(), f"{DOMAIN} {self.api.address} start push"
+            )
+        return state
\ No newline at end of file
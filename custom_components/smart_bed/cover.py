@@ -0,0 +1,89 @@
+"""Platform for cover integration."""
+from __future__ import annotations
+from typing import Any
+from homeassistant.components.cover import ATTR_POSITION, CoverEntity, CoverEntityFeature
+from homeassistant.core import HomeAssistant
+from homeassistant.config_entries import ConfigEntry
+from homeassistant.helpers.entity_platform import AddEntitiesCallback
+from homeassistant.helpers.restore_state import RestoreEntity
+from .const import DOMAIN
+from .coordinator import SmartBedCoordinator
+from .entity import SmartBedCoordinatorEntity
+from .smart_bed_device.const import MOTOR_BED, MOTOR_HEAD, MOTOR_LEGS
+
+ATTR_CURRENT_POSITION = "current_position"
+
+
+async def async_setup_entry(
+        hass: HomeAssistant,
+        config_entry: ConfigEntry,
+        async_add_entities: AddEntitiesCallback,
+        ) -> None:
+    """Add covers for passed config_entry in HA."""
+    coordinator: SmartBedCoordinator = hass.data[DOMAIN][config_entry.entry_id]
+
+    async_add_entities([
+        MotorPositionCover(coordinator, MOTOR_BED, "Bed"),
+        MotorPositionCover(coordinator, MOTOR_HEAD, "Head"),
+        MotorPositionCover(coordinator, MOTOR_LEGS, "Legs"),
+    ])
+
+
+class MotorPositionCover(SmartBedCoordinatorEntity, CoverEntity, RestoreEntity):
+    """Estimated position of a bed motor, which can be moved to a position."""
+    _attr_supported_features = (
+        CoverEntityFeature.OPEN
+        | CoverEntityFeature.CLOSE
+        | CoverEntityFeature.STOP
+        | CoverEntityFeature.SET_POSITION
+    )
+
+    def __init__(self,
+                 coordinator: SmartBedCoordinator,
+                 motor: str,
+                 label: str,
+                 ) -> None:
+        """Initialize the cover."""
+        super().__init__(coordinator)
+        self._motor = motor
+        self._attr_unique_id = f"{self._device.identifier}_{motor}_position"
+        self._attr_name = f"{self._device.name} {label} Position"
+
+    async def async_added_to_hass(self) -> None:
+        """Restore the last estimated position, the motors don't report it."""
+        await super().async_added_to_hass()
+        if self._device.position(self._motor) is not None:
+            return
+        if (last_state := await self.async_get_last_state()) is not None:
+            if (position := last_state.attributes.get(ATTR_CURRENT_POSITION)) is not None:
+                self._device.restore_position(self._motor, float(position))
+
+    @property
+    def current_cover_position(self) -> int | None:
+        position = self._device.position(self._motor)
+        return None if position is None else round(position)
+
+    @property
+    def is_closed(self) -> bool | None:
+        position = self._device.position(self._motor)
+        return None if position is None else position == 0
+
+    @property
+    def is_opening(self) -> bool:
+        return self._device.is_moving(self._motor, up=True)
+
+    @property
+    def is_closing(self) -> bool:
+        return self._device.is_moving(self._motor, up=False)
+
+    async def async_open_cover(self, **kwargs: Any) -> None:
+        await self._device.set_position(self._motor, 100)
+
+    async def async_close_cover(self, **kwargs: Any) -> None:
+        await self._device.set_position(self._motor, 0)
+
+    async def async_stop_cover(self, **kwargs: Any) -> None:
+        await self._device.stop()
+
+    async def async_set_cover_position(self, **kwargs: Any) -> None:
+        await self._device.set_position(self._motor, kwargs[ATTR_POSITION])
@@ -0,0 +1,43 @@
+"""Diagnostics support for Smart Bed."""
+from __future__ import annotations
+from dataclasses import asdict
+from typing import Any
+from homeassistant.config_entries import ConfigEntry
+from homeassistant.core import HomeAssistant
+from .const import DOMAIN
+from .coordinator import SmartBedCoordinator
+
+
+async def async_get_config_entry_diagnostics(hass: HomeAssistant, entry: ConfigEntry) -> dict[str, Any]:
+    """Return the connection statistics and operation timings of a config entry."""
+    coordinator: SmartBedCoordinator = hass.data[DOMAIN][entry.entry_id]
+    device = coordinator.api
+    statistics = device.last_move_statistics
+    state = coordinator.data
+
+    return {
+        "entry": {
+            "data": dict(entry.data),
+            "options": dict(entry.options),
+        },
+        "device": {
+            "address": device.address,
+            "identity": device.identity,
+            "notifying": sorted(device.notifying),
+            "active_motors": sorted(device.executor.active_motors),
+        },
+        "coordinator": {
+            "update_interval": coordinator.update_interval.total_seconds() if coordinator.update_interval else None,
+            "last_update_success": coordinator.last_update_success,
+            "data": None if state is None else {**asdict(state), "active_motors": sorted(state.active_motors)},
+        },
+        "connection": device.connection.statistics,
+        "health": {
+            "unavailable": device.health.is_open,
+            "consecutive_failures": device.health.consecutive_failures,
+            "failure_count": device.health.failure_count,
+            "last_success_age": device.health.last_success_age,
+        },
+        "timings": device.timings.as_dict(),
+        "last_move": statistics.as_dict() if statistics else None,
+    }
@@ -0,0 +1,29 @@
+"""Base entities for the Smart Bed integration."""
+from __future__ import annotations
+from homeassistant.helpers.entity import Entity
+from homeassistant.helpers.update_coordinator import CoordinatorEntity
+from .const import DOMAIN
+from .coordinator import SmartBedCoordinator
+from .smart_bed_device import SmartBedDevice
+
+
+class SmartBedEntity(Entity):
+    """Entity linked to a Smart Bed device."""
+    _attr_should_poll = False
+
+    def __init__(self, device: SmartBedDevice) -> None:
+        self._device = device
+
+    @property
+    def device_info(self):
+        """Return information to link this entity with the correct device."""
+        return {"identifiers": {(DOMAIN, self._device.identifier)}}
+
+
+class SmartBedCoordinatorEntity(CoordinatorEntity[SmartBedCoordinator], SmartBedEntity):
+    """Smart Bed entity updated by the coordinator."""
+
+    def __init__(self, coordinator: SmartBedCoordinator, context: str | None = None) -> None:
+        """`context` is the device state field the entity shows, if any."""
+        super().__init__(coordinator, context)
+        self._device: SmartBedDevice = coordinator.api
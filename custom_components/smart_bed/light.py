@@ -0,0 +1,116 @@
+"""Platform for light integration."""
+from __future__ import annotations
+import logging
+from typing import Any
+from homeassistant.components.light import ATTR_BRIGHTNESS, ColorMode, LightEntity
+from homeassistant.core import HomeAssistant, callback
+from homeassistant.config_entries import ConfigEntry
+from homeassistant.helpers.entity_platform import AddEntitiesCallback
+from homeassistant.helpers.event import async_call_later
+from .const import DOMAIN, LIGHT_DEBOUNCE
+from .coordinator import SmartBedCoordinator
+from .entity import SmartBedCoordinatorEntity
+
+_LOGGER = logging.getLogger(__name__)
+
+
+async def async_setup_entry(
+        hass: HomeAssistant,
+        config_entry: ConfigEntry,
+        async_add_entities: AddEntitiesCallback,
+        ) -> None:
+    """Add lights for passed config_entry in HA."""
+    coordinator: SmartBedCoordinator = hass.data[DOMAIN][config_entry.entry_id]
+
+    async_add_entities([
+        FloorLight(coordinator),
+    ])
+
+
+class FloorLight(SmartBedCoordinatorEntity, LightEntity):
+    """The floor light, dimmable in percent.
+
+    Changes show right away and are written once they stopped coming for
+    LIGHT_DEBOUNCE seconds, so only the last of several quick toggles
+    reaches the bed. A change made while a write runs is written after it.
+    """
+    _attr_color_mode = ColorMode.BRIGHTNESS
+    _attr_supported_color_modes = {ColorMode.BRIGHTNESS}
+
+    def __init__(self,
+                 coordinator: SmartBedCoordinator,
+                 ) -> None:
+        """Initialize the light."""
+        super().__init__(coordinator, "floor_light")
+        self._attr_unique_id = f"{self._device.identifier}_floor_light_control"
+        self._attr_name = f"{self._device.name} Floor Light"
+        self._pending: int | None = None
+        self._last_on_level = 100
+        self._unsub_write = None
+        self._write_task = None
+
+    @property
+    def _level(self) -> int | None:
+        if self._pending is not None:
+            return self._pending
+        if self.coordinator.data is None:
+            return None
+        return self.coordinator.data.floor_light
+
+    @property
+    def is_on(self) -> bool | None:
+        level = self._level
+        return None if level is None else level > 0
+
+    @property
+    def brightness(self) -> int | None:
+        level = self._level
+        return None if not level else round(min(level, 100) * 255 / 100)
+
+    async def async_turn_on(self, **kwargs: Any) -> None:
+        if ATTR_BRIGHTNESS in kwargs:
+            level = max(round(kwargs[ATTR_BRIGHTNESS] * 100 / 255), 1)
+        else:
+            level = self._level or self._last_on_level
+        await self._async_request_level(level)
+
+    async def async_turn_off(self, **kwargs: Any) -> None:
+        if level := self._level:
+            self._last_on_level = level
+        await self._async_request_level(0)
+
+    async def _async_request_level(self, level: int) -> None:
+        # Show the change now, the write follows once the changes settle
+        self._pending = level
+        self.async_write_ha_state()
+        if self._unsub_write is not None:
+            self._unsub_write()
+        self._unsub_write = async_call_later(self.hass, LIGHT_DEBOUNCE, self._async_write_settled)
+
+    @callback
+    def _async_write_settled(self, _now) -> None:
+        self._unsub_write = None
+        if self._write_task is not None and not self._write_task.done():
+            # The running write continues with the newer level
+            return
+        self._write_task = self.hass.async_create_task(self._async_write_level())
+
+    async def _async_write_level(self) -> None:
+        while (level := self._pending) is not None:
+            try:
+                await self._device.set_floor_light(level)
+            except Exception as err:
+                _LOGGER.warning("Could not set the floor light of %s: %s", self._device.name, err)
+            if self._pending == level:
+                self._pending = None
+                self.async_write_ha_state()
+                return
+            if self._unsub_write is not None:
+                # The newer level is still settling, its timer writes it
+                return
+
+    async def async_will_remove_from_hass(self) -> None:
+        if self._unsub_write is not None:
+            self._unsub_write()
+            self._unsub_write = None
+        await super().async_will_remove_from_hass()
@@ -0,0 +1,102 @@
+"""Shared Bluetooth adapter scheduling for all configured Smart Beds."""
+from __future__ import annotations
+import asyncio
+import heapq
+import itertools
+import logging
+import time
+from contextlib import asynccontextmanager
+from functools import partial
+from typing import AsyncIterator, Callable
+from homeassistant.components import bluetooth
+from homeassistant.core import HomeAssistant
+from .const import MAX_CONNECTS_PER_ADAPTER, POLL_STAGGER
+from .smart_bed_device import SmartBedDevice
+from .smart_bed_device.const import PRIORITY_BACKGROUND
+
+_LOGGER = logging.getLogger(__name__)
+
+
+class AdapterSlots:
+    """Limit concurrent connects on one adapter, handing free slots out by priority."""
+
+    def __init__(self, limit: int) -> None:
+        self._limit = limit
+        self._active = 0
+        self._waiters: list[tuple[int, int, asyncio.Future]] = []
+        self._sequence = itertools.count()
+        self._next_background = 0.0
+
+    @asynccontextmanager
+    async def acquire(self, priority: int) -> AsyncIterator[None]:
+        if priority >= PRIORITY_BACKGROUND:
+            await self._stagger()
+        if self._active < self._limit and not self._waiters:
+            self._active += 1
+        else:
+            future = asyncio.get_running_loop().create_future()
+            heapq.heappush(self._waiters, (priority, next(self._sequence), future))
+            try:
+                await future
+            except asyncio.CancelledError:
+                if future.done() and not future.cancelled():
+                    # The slot was handed to us just before the cancellation
+                    self._release()
+                raise
+        try:
+            yield
+        finally:
+            self._release()
+
+    def _release(self) -> None:
+        while self._waiters:
+            _, _, future = heapq.heappop(self._waiters)
+            if not future.done():
+                # Hand the slot over without freeing it
+                future.set_result(None)
+                return
+        self._active -= 1
+
+    async def _stagger(self) -> None:
+        # Space out background connects so beds polled on the same schedule
+        # drift apart, but don't hold one back on an idle adapter
+        now = time.monotonic()
+        idle = self._active == 0 and not self._waiters
+        start = now if idle else max(now, self._next_background)
+        self._next_background = start + POLL_STAGGER
+        if start > now:
+            await asyncio.sleep(start - now)
+
+
+class SmartBedManager:
+    """Schedule the connects of all beds over the available Bluetooth adapters."""
+
+    def __init__(self, hass: HomeAssistant) -> None:
+        self.hass = hass
+        self._adapters: dict[str | None, AdapterSlots] = {}
+
+    def async_register(self, smart_bed: SmartBedDevice) -> Callable[[], None]:
+        """Route the connects of `smart_bed` through the manager. Returns an unregister function."""
+        smart_bed.connection.connect_slot = partial(self._connect_slot, smart_bed)
+
+        def _unregister() -> None:
+            smart_bed.connection.connect_slot = None
+
+        return _unregister
+
+    def _async_select_adapter(self, smart_bed: SmartBedDevice) -> str | None:
+        """Use the connectable adapter that hears the bed best, returning its source."""
+        scanner_devices = bluetooth.async_scanner_devices_by_address(self.hass, smart_bed.address, connectable=True)
+        if not scanner_devices:
+            return None
+        best = max(scanner_devices, key=lambda scanner_device: scanner_device.advertisement.rssi)
+        smart_bed.set_ble_device(best.ble_device)
+        return best.scanner.source
+
+    @asynccontextmanager
+    async def _connect_slot(self, smart_bed: SmartBedDevice, priority: int) -> AsyncIterator[None]:
+        source = self._async_select_adapter(smart_bed)
+        slots = self._adapters.setdefault(source, AdapterSlots(MAX_CONNECTS_PER_ADAPTER))
+        _LOGGER.debug("%s: waiting for a connect slot on %s (priority %d)", smart_bed.name, source, priority)
+        async with slots.acquire(priority):
+            yield
@@ -0,0 +1,70 @@
+"""Platform for select integration."""
+from __future__ import annotations
+import logging
+from homeassistant.components.select import SelectEntity
+from homeassistant.core import HomeAssistant
+from homeassistant.config_entries import ConfigEntry
+from homeassistant.helpers.entity_platform import AddEntitiesCallback
+from .const import DOMAIN
+from .coordinator import SmartBedCoordinator
+from .entity import SmartBedCoordinatorEntity
+from .smart_bed_device.const import MOTOR_COMMANDS
+
+_LOGGER = logging.getLogger(__name__)
+
+OPTION_STOP = "stop"
+
+# Option name -> (motor, up)
+MOVE_OPTIONS = {
+    f"{motor}_{'up' if up else 'down'}": (motor, up)
+    for motor in MOTOR_COMMANDS
+    for up in (True, False)
+}
+
+
+async def async_setup_entry(
+        hass: HomeAssistant,
+        config_entry: ConfigEntry,
+        async_add_entities: AddEntitiesCallback,
+        ) -> None:
+    """Add selects for passed config_entry in HA."""
+    coordinator: SmartBedCoordinator = hass.data[DOMAIN][config_entry.entry_id]
+
+    async_add_entities([
+        MotorMoveSelect(coordinator),
+    ])
+
+
+class MotorMoveSelect(SmartBedCoordinatorEntity, SelectEntity):
+    """Hold-to-move control that streams one continuous command until it is set back to stop."""
+    _attr_options = [OPTION_STOP, *MOVE_OPTIONS]
+
+    def __init__(self,
+                 coordinator: SmartBedCoordinator,
+                 ) -> None:
+        """Initialize the select."""
+        super().__init__(coordinator)
+        self._attr_unique_id = f"{self._device.identifier}_move"
+        self._attr_name = f"{self._device.name} Move"
+
+    @property
+    def current_option(self) -> str:
+        for option, (motor, up) in MOVE_OPTIONS.items():
+            if self._device.is_moving(motor, up):
+                return option
+        return OPTION_STOP
+
+    async def async_select_option(self, option: str) -> None:
+        if option == OPTION_STOP:
+            await self._device.stop()
+            return
+        motor, up = MOVE_OPTIONS[option]
+        # The move runs until stopped or the end of the range, don't block the service call
+        self.hass.async_create_background_task(self._async_move(motor, up), f"{DOMAIN} {option}")
+
+    async def _async_move(self, motor: str, up: bool) -> None:
+        # Nobody awaits the task, so a failed move is reported here
+        try:
+            await self._device.move(motor, up)
+        except Exception as err:
+            _LOGGER.warning("Could not move the %s of %s: %s", motor, self._device.name, err)
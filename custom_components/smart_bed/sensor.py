@@ -1,15 +1,33 @@
 """Platform for sensor integration."""
 from __future__ import annotations
+from homeassistant.components import bluetooth
+from homeassistant.components.bluetooth import BluetoothServiceInfoBleak
 from homeassistant.core import HomeAssistant
 from homeassistant.config_entries import ConfigEntry
 from homeassistant.helpers.entity_platform import AddEntitiesCallback
 from homeassistant.helpers.typing import StateType
+from homeassistant.util import dt as dt_util
 from homeassistant.components.sensor import SensorEntity, SensorStateClass, SensorDeviceClass
-from homeassistant.const import PERCENTAGE, STATE_UNKNOWN, UnitOfTemperature
-from homeassistant.helpers.update_coordinator import CoordinatorEntity, DataUpdateCoordinator
+from homeassistant.const import (
+    PERCENTAGE,
+    SIGNAL_STRENGTH_DECIBELS_MILLIWATT,
+    STATE_UNKNOWN,
+    EntityCategory,
+    UnitOfTemperature,
+    UnitOfTime,
+)
 from .const import DOMAIN
+from .smart_bed_device.const import TIMING_CONNECT, TIMING_MOTOR_ACTION, TIMING_READ, TIMING_WRITE
 from .coordinator import SmartBedCoordinator
-from .smart_bed_device import SmartBedDevice
+from .entity import SmartBedCoordinatorEntity
+
+# Operations that get a debug sensor with their rolling 95th percentile
+TIMED_OPERATIONS = {
+    TIMING_CONNECT: "Connect",
+    TIMING_READ: "Read",
+    TIMING_WRITE: "Write",
+    TIMING_MOTOR_ACTION: "Motor Action",
+}
 
 
 async def async_setup_entry(
@@ -24,20 +42,25 @@ async def async_setup_entry(
         MotorStatusSensor(coordinator),
         FloorLightSensor(coordinator),
         ChipTempSensor(coordinator),
+        ConnectTimeSensor(coordinator),
+        ConnectionReuseSensor(coordinator),
+        SignalStrengthSensor(coordinator),
+        MeanConnectTimeSensor(coordinator),
+        FailureCountSensor(coordinator),
+        LastSuccessSensor(coordinator),
+        ProgramProgressSensor(coordinator),
+        PrewarmHitRateSensor(coordinator),
+        *(OperationTimeSensor(coordinator, operation) for operation in TIMED_OPERATIONS),
     ])
 
 
-class SensorBase(CoordinatorEntity[SmartBedCoordinator], SensorEntity):
-    def __init__(self, 
-                 coordinator: SmartBedCoordinator
-                ) -> None:
-        super().__init__(coordinator)
-        self._device: SmartBedDevice = coordinator.api
-
+class SensorBase(SmartBedCoordinatorEntity, SensorEntity):
     @property
-    def device_info(self):
-        """Return information to link this entity with the correct device."""
-        return {"identifiers": {(DOMAIN, self._device.identifier)}}
+    def _field_value(self) -> StateType:
+        """Value of the state field this sensor shows."""
+        if self.coordinator.data is None:
+            return None
+        return getattr(self.coordinator.data, self.coordinator_context)
 
 
 class MotorStatusSensor(SensorBase):
@@ -48,14 +71,14 @@ class MotorStatusSensor(SensorBase):
                  coordinator: SmartBedCoordinator, 
                  ) -> None:
         """Initialize the sensor."""
-        super().__init__(coordinator)
+        super().__init__(coordinator, "motor_status")
         self._attr_unique_id = f"{self._device.identifier}_motor_status"
         self._attr_name = f"{self._device.name} Motor Status"
 
     @property
     def native_value(self) -> StateType:
         """Return the state of the sensor."""
-        return self._device.motor_status
+        return self._field_value
     
 
 class FloorLightSensor(SensorBase):
@@ -66,7 +89,7 @@ class FloorLightSensor(SensorBase):
                  coordinator: SmartBedCoordinator,
                  ) -> None:
         """Initialize the sensor."""
-        super().__init__(coordinator)
+        super().__init__(coordinator, "floor_light")
         self._attr_unique_id = f"{self._device.identifier}_floor_light"
         self._attr_name = f"{self._device.name} Floor Light"
         self._attr_device_class = "light"
@@ -74,7 +97,7 @@ class FloorLightSensor(SensorBase):
     @property
     def native_value(self) -> StateType:
         """Return the state of the sensor."""
-        return self._device.floor_light
+        return self._field_value
     
 
 class ChipTempSensor(SensorBase):
@@ -85,7 +108,7 @@ class ChipTempSensor(SensorBase):
                 coordinator: SmartBedCoordinator
                 ) -> None:
         """Initialize the sensor."""
-        super().__init__(coordinator)
+        super().__init__(coordinator, "chip_temp")
         self._attr_unique_id = f"{self._device.identifier}_chip_temp"
         self._attr_name = f"{self._device.name} Chip Temp"
         self.temperature = STATE_UNKNOWN
@@ -93,4 +116,248 @@ class ChipTempSensor(SensorBase):
     @property
     def native_value(self) -> StateType:
         """Return the state of the sensor."""
-        return self._device.chip_temp
\ No newline at end of file
+        return self._field_value
+
+
+class ConnectTimeSensor(SensorBase):
+    _attr_native_unit_of_measurement = UnitOfTime.SECONDS
+    _attr_device_class = SensorDeviceClass.DURATION
+    _attr_state_class = SensorStateClass.MEASUREMENT
+    _attr_entity_category = EntityCategory.DIAGNOSTIC
+
+    def __init__(self,
+                coordinator: SmartBedCoordinator
+                ) -> None:
+        """Initialize the sensor."""
+        super().__init__(coordinator)
+        self._attr_unique_id = f"{self._device.identifier}_connect_time"
+        self._attr_name = f"{self._device.name} Connect Time"
+
+    @property
+    def native_value(self) -> StateType:
+        """Return the latency of the last BLE connect."""
+        return self._device.connection.last_connect_time
+
+
+class ConnectionReuseSensor(SensorBase):
+    _attr_state_class = SensorStateClass.TOTAL_INCREASING
+    _attr_entity_category = EntityCategory.DIAGNOSTIC
+
+    def __init__(self,
+                coordinator: SmartBedCoordinator
+                ) -> None:
+        """Initialize the sensor."""
+        super().__init__(coordinator)
+        self._attr_unique_id = f"{self._device.identifier}_connection_reuse"
+        self._attr_name = f"{self._device.name} Connection Reuses"
+
+    @property
+    def native_value(self) -> StateType:
+        """Return how many calls reused the pooled connection."""
+        return self._device.connection.reuse_count
+
+    @property
+    def extra_state_attributes(self):
+        return self._device.connection.statistics
+
+
+
+class SignalStrengthSensor(SensorBase):
+    _attr_native_unit_of_measurement = SIGNAL_STRENGTH_DECIBELS_MILLIWATT
+    _attr_device_class = SensorDeviceClass.SIGNAL_STRENGTH
+    _attr_state_class = SensorStateClass.MEASUREMENT
+    _attr_entity_category = EntityCategory.DIAGNOSTIC
+    _attr_entity_registry_enabled_default = False
+
+    def __init__(self,
+                coordinator: SmartBedCoordinator
+                ) -> None:
+        """Initialize the sensor."""
+        super().__init__(coordinator)
+        self._attr_unique_id = f"{self._device.identifier}_rssi"
+        self._attr_name = f"{self._device.name} Signal Strength"
+
+    @property
+    def available(self) -> bool:
+        # Advertisements arrive without the coordinator polling the bed
+        return self._service_info is not None
+
+    @property
+    def native_value(self) -> StateType:
+        """Return the RSSI of the last advertisement."""
+        service_info = self._service_info
+        return None if service_info is None else service_info.rssi
+
+    @property
+    def _service_info(self) -> BluetoothServiceInfoBleak | None:
+        # Advertisements that only change the RSSI don't reach the coordinator,
+        # the bluetooth integration still tracks their RSSI
+        return bluetooth.async_last_service_info(self.hass, self._device.address, connectable=False)
+
+
+class MeanConnectTimeSensor(SensorBase):
+    _attr_native_unit_of_measurement = UnitOfTime.SECONDS
+    _attr_device_class = SensorDeviceClass.DURATION
+    _attr_state_class = SensorStateClass.MEASUREMENT
+    _attr_entity_category = EntityCategory.DIAGNOSTIC
+
+    def __init__(self,
+                coordinator: SmartBedCoordinator
+                ) -> None:
+        """Initialize the sensor."""
+        super().__init__(coordinator)
+        self._attr_unique_id = f"{self._device.identifier}_mean_connect_time"
+        self._attr_name = f"{self._device.name} Mean Connect Time"
+
+    @property
+    def available(self) -> bool:
+        # Diagnostics stay readable while the bed is unreachable
+        return True
+
+    @property
+    def native_value(self) -> StateType:
+        """Return the mean latency of the BLE connects."""
+        return self._device.connection.mean_connect_time
+
+
+class FailureCountSensor(SensorBase):
+    _attr_state_class = SensorStateClass.TOTAL_INCREASING
+    _attr_entity_category = EntityCategory.DIAGNOSTIC
+
+    def __init__(self,
+                coordinator: SmartBedCoordinator
+                ) -> None:
+        """Initialize the sensor."""
+        super().__init__(coordinator)
+        self._attr_unique_id = f"{self._device.identifier}_connect_failures"
+        self._attr_name = f"{self._device.name} Connect Failures"
+
+    @property
+    def available(self) -> bool:
+        return True
+
+    @property
+    def native_value(self) -> StateType:
+        """Return how many connects failed."""
+        return self._device.health.failure_count
+
+    @property
+    def extra_state_attributes(self):
+        return {
+            "consecutive_failures": self._device.health.consecutive_failures,
+            "unavailable": self._device.health.is_open,
+        }
+
+
+class LastSuccessSensor(SensorBase):
+    _attr_device_class = SensorDeviceClass.TIMESTAMP
+    _attr_entity_category = EntityCategory.DIAGNOSTIC
+
+    def __init__(self,
+                coordinator: SmartBedCoordinator
+                ) -> None:
+        """Initialize the sensor."""
+        super().__init__(coordinator)
+        self._attr_unique_id = f"{self._device.identifier}_last_connect_success"
+        self._attr_name = f"{self._device.name} Last Connect Success"
+
+    @property
+    def available(self) -> bool:
+        return True
+
+    @property
+    def native_value(self):
+        """Return when a connect last succeeded."""
+        if (timestamp := self._device.health.last_success_timestamp) is None:
+            return None
+        return dt_util.utc_from_timestamp(timestamp)
+
+
+class OperationTimeSensor(SensorBase):
+    _attr_native_unit_of_measurement = UnitOfTime.SECONDS
+    _attr_device_class = SensorDeviceClass.DURATION
+    _attr_state_class = SensorStateClass.MEASUREMENT
+    _attr_entity_category = EntityCategory.DIAGNOSTIC
+    _attr_entity_registry_enabled_default = False
+
+    def __init__(self,
+                coordinator: SmartBedCoordinator,
+                operation: str,
+                ) -> None:
+        """Initialize the sensor."""
+        super().__init__(coordinator)
+        self._operation = operation
+        self._attr_unique_id = f"{self._device.identifier}_{operation}_time_p95"
+        self._attr_name = f"{self._device.name} {TIMED_OPERATIONS[operation]} Time P95"
+
+    @property
+    def available(self) -> bool:
+        return True
+
+    @property
+    def native_value(self) -> StateType:
+        """Return the 95th percentile of the recent durations of the operation."""
+        return self._device.timings.histogram(self._operation).percentile(0.95)
+
+    @property
+    def extra_state_attributes(self):
+        return self._device.timings.histogram(self._operation).as_dict()
+
+
+class PrewarmHitRateSensor(SensorBase):
+    _attr_native_unit_of_measurement = PERCENTAGE
+    _attr_state_class = SensorStateClass.MEASUREMENT
+    _attr_entity_category = EntityCategory.DIAGNOSTIC
+    _attr_entity_registry_enabled_default = False
+
+    def __init__(self,
+                coordinator: SmartBedCoordinator
+                ) -> None:
+        """Initialize the sensor."""
+        super().__init__(coordinator)
+        self._attr_unique_id = f"{self._device.identifier}_prewarm_hit_rate"
+        self._attr_name = f"{self._device.name} Prewarm Hit Rate"
+
+    @property
+    def available(self) -> bool:
+        return True
+
+    @property
+    def native_value(self) -> StateType:
+        """Return the share of prewarmed connections a command used."""
+        if (hit_rate := self._device.connection.prewarm_hit_rate) is None:
+            return None
+        return round(hit_rate * 100)
+
+    @property
+    def extra_state_attributes(self):
+        connection = self._device.connection
+        return {
+            "prewarms": connection.prewarm_count,
+            "hits": connection.prewarm_hits,
+            "wasted": connection.prewarm_wasted,
+        }
+
+
+class ProgramProgressSensor(SensorBase):
+    _attr_native_unit_of_measurement = PERCENTAGE
+    _attr_icon = "mdi:progress-clock"
+
+    def __init__(self,
+                coordinator: SmartBedCoordinator
+                ) -> None:
+        """Initialize the sensor."""
+        super().__init__(coordinator)
+        self._attr_unique_id = f"{self._device.identifier}_program_progress"
+        self._attr_name = f"{self._device.name} Program Progress"
+
+    @property
+    def native_value(self) -> StateType:
+        """Return how much of the running motion program has started."""
+        if (progress := self._device.program_progress) is None:
+            return None
+        return round(progress * 100)
+
+    @property
+    def extra_state_attributes(self):
+        return {"program": self._device.active_program}
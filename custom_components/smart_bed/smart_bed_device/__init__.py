@@ -1,8 +1,42 @@
-"""Parser for Smart Bed BLE advertisements."""
+"""Async library for Smart Bed BLE devices, independent of Home Assistant."""
 from __future__ import annotations
 
+from .batch import BatchResult, SmartBedBatch
+from .connection import SmartBedConnection
+from .exceptions import SmartBedBusyError, SmartBedError, SmartBedProgramError, SmartBedUnavailableError
+from .executor import MotorCommandExecutor
+from .health import DeviceHealth
+from .parser import SmartBedAdvertisement, parse_advertisement
+from .position import MotorPosition
+from .program import MotionProgram, MotionStep, parse_program
 from .smart_bed_device import SmartBedDevice
+from .state import SmartBedReading, SmartBedState
+from .stream import MotorCommandStream, MotorStreamStatistics
+from .timing import OperationTimings, TimingHistogram
 
 __version__ = "0.1.0"
 
-__all__ = ["SmartBedDevice"]
\ No newline at end of file
+__all__ = [
+    "BatchResult",
+    "DeviceHealth",
+    "MotionProgram",
+    "MotionStep",
+    "MotorCommandExecutor",
+    "MotorCommandStream",
+    "MotorPosition",
+    "MotorStreamStatistics",
+    "OperationTimings",
+    "SmartBedAdvertisement",
+    "SmartBedBatch",
+    "SmartBedBusyError",
+    "SmartBedConnection",
+    "SmartBedDevice",
+    "SmartBedError",
+    "SmartBedProgramError",
+    "SmartBedReading",
+    "SmartBedState",
+    "SmartBedUnavailableError",
+    "TimingHistogram",
+    "parse_advertisement",
+    "parse_program",
+]
\ No newline at end of file
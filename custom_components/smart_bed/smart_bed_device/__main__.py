@@ -0,0 +1,140 @@
+"""Command line interface for Smart Beds, printing JSON.
+
+    smart-bed-device scan
+    smart-bed-device info --all
+    smart-bed-device state AA:BB:CC:DD:EE:FF 11:22:33:44:55:66
+    smart-bed-device move --all --motor head --direction up --duration 2
+    smart-bed-device program --all --steps '[{"motor": "bed", "direction": "up"}]'
+    smart-bed-device light AA:BB:CC:DD:EE:FF --level 50
+
+`pip install .` in the repository root installs the library as the
+standalone `smart_bed_device` package, which only needs bleak and
+bleak-retry-connector, together with this command. `python -m
+smart_bed_device` runs it as well. Beds are handled `--concurrency` at a
+time.
+"""
+
+from __future__ import annotations
+import argparse
+import asyncio
+import json
+import logging
+import sys
+from dataclasses import asdict
+from . import __version__
+from .batch import SmartBedBatch
+from .const import DEFAULT_BATCH_CONCURRENCY, DEFAULT_BATCH_TIMEOUT, DEFAULT_SCAN_TIMEOUT, MOTOR_COMMANDS
+from .program import DIRECTIONS, parse_program
+from .smart_bed_device import SmartBedDevice
+
+_LOGGER = logging.getLogger(__package__)
+
+
+async def _info(device: SmartBedDevice, options: argparse.Namespace) -> dict:
+    await device.update_device_info()
+    return device.identity
+
+
+async def _state(device: SmartBedDevice, options: argparse.Namespace) -> dict:
+    reading = await device.update_device_data()
+    state = asdict(device.state)
+    state.pop("active_motors")
+    return {**state, "failed": sorted(reading.failed)}
+
+
+async def _move(device: SmartBedDevice, options: argparse.Namespace) -> None:
+    await device.move(options.motor, DIRECTIONS[options.direction], options.duration)
+
+
+async def _program(device: SmartBedDevice, options: argparse.Namespace) -> None:
+    await device.run_program(options.program)
+
+
+async def _light(device: SmartBedDevice, options: argparse.Namespace) -> None:
+    await device.set_floor_light(options.level)
+
+
+OPERATIONS = {
+    "info": _info,
+    "state": _state,
+    "move": _move,
+    "program": _program,
+    "light": _light,
+}
+
+
+async def run(options: argparse.Namespace) -> list[dict]:
+    batch = SmartBedBatch(_LOGGER, options.concurrency, options.timeout, options.scan_timeout)
+    if options.command == "scan" or options.all:
+        advertisements = await batch.scan()
+        if options.command == "scan":
+            return [
+                {**asdict(advertisement), "manufacturer_data": advertisement.manufacturer_data.hex()}
+                for advertisement in advertisements
+            ]
+        addresses = [advertisement.address for advertisement in advertisements]
+    else:
+        addresses = options.addresses
+
+    operation = OPERATIONS[options.command]
+    results = await batch.run(addresses, lambda device: operation(device, options))
+    return [result.as_dict() for result in results]
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(prog="smart-bed-device", description=__doc__.splitlines()[0])
+    parser.add_argument("--version", action="version", version=__version__)
+    parser.add_argument("--concurrency", type=int, default=DEFAULT_BATCH_CONCURRENCY, help="beds handled at once")
+    parser.add_argument("--timeout", type=float, default=DEFAULT_BATCH_TIMEOUT, help="seconds per bed")
+    parser.add_argument("--scan-timeout", type=float, default=DEFAULT_SCAN_TIMEOUT, help="seconds to scan")
+    parser.add_argument("--debug", action="store_true", help="log what the beds are doing")
+    commands = parser.add_subparsers(dest="command", required=True)
+    commands.add_parser("scan", help="list the beds in range")
+
+    def _command(name: str, help: str) -> argparse.ArgumentParser:
+        command = commands.add_parser(name, help=help)
+        command.add_argument("addresses", nargs="*", metavar="address", help="addresses of the beds")
+        command.add_argument("--all", action="store_true", help="every bed found by a scan")
+        return command
+
+    _command("info", "read manufacturer, model and firmware")
+    _command("state", "read the motor status, floor light and chip temperature")
+    move = _command("move", "drive a motor")
+    move.add_argument("--motor", choices=list(MOTOR_COMMANDS), required=True)
+    move.add_argument("--direction", choices=list(DIRECTIONS), required=True)
+    move.add_argument("--duration", type=float, help="seconds, the whole range if left out")
+    program = _command("program", "run a motion program")
+    program.add_argument("--steps", required=True, help="program definition as JSON, or @file to read it from")
+    program.add_argument("--name", default="CLI", help="name of the program")
+    light = _command("light", "set the floor light")
+    light.add_argument("--level", type=int, required=True, help="percent, 0 switches it off")
+
+    options = parser.parse_args()
+    if options.command != "scan" and not options.addresses and not options.all:
+        parser.error("give the addresses of the beds or --all")
+    if options.command != "scan" and options.addresses and options.all:
+        parser.error("give either addresses or --all")
+    if options.command == "program":
+        steps = options.steps
+        if steps.startswith("@"):
+            with open(steps[1:], encoding="utf-8") as file:
+                steps = file.read()
+        try:
+            options.program = parse_program(options.name, json.loads(steps))
+        except ValueError as err:
+            parser.error(f"invalid program: {err}")
+    logging.basicConfig(level=logging.DEBUG if options.debug else logging.WARNING)
+
+    try:
+        results = asyncio.run(run(options))
+    except Exception as err:
+        # E.g. no Bluetooth adapter to scan with
+        print(f"smart-bed-device: {err}", file=sys.stderr)
+        return 2
+    json.dump(results, sys.stdout, indent=2)
+    print()
+    return 0 if all(result.get("ok", True) for result in results) else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,109 @@
+"""Run operations on many Smart Bed devices at once, outside Home Assistant."""
+
+from __future__ import annotations
+import asyncio
+import time
+from dataclasses import dataclass
+from logging import Logger
+from typing import Any, Awaitable, Callable, Iterable
+from .const import DEFAULT_BATCH_CONCURRENCY, DEFAULT_BATCH_TIMEOUT, DEFAULT_SCAN_TIMEOUT
+from .parser import SmartBedAdvertisement, parse_advertisement
+from .smart_bed_device import SmartBedDevice
+from bleak import BleakScanner
+from bleak.backends.device import BLEDevice
+
+
+@dataclass(slots=True)
+class BatchResult:
+    """Outcome of an operation on one bed."""
+    address: str
+    name: str | None = None
+    ok: bool = False
+    result: Any = None
+    error: str | None = None
+    elapsed: float | None = None
+
+    def as_dict(self) -> dict[str, Any]:
+        return {
+            "address": self.address,
+            "name": self.name,
+            "ok": self.ok,
+            "result": self.result,
+            "error": self.error,
+            "elapsed": self.elapsed,
+        }
+
+
+class SmartBedBatch:
+    """Run the same operation on many beds, `concurrency` of them at a time.
+
+    Addresses are resolved from one scan. Every bed gets its own device and
+    connection, which is closed when its operation finished, failed or
+    took longer than `timeout` seconds. One failing bed doesn't affect the
+    others.
+    """
+
+    def __init__(self, logger: Logger, concurrency: int = DEFAULT_BATCH_CONCURRENCY,
+                 timeout: float = DEFAULT_BATCH_TIMEOUT, scan_timeout: float = DEFAULT_SCAN_TIMEOUT):
+        self.logger = logger
+        self.concurrency = concurrency
+        self.timeout = timeout
+        self.scan_timeout = scan_timeout
+        self.__ble_devices: dict[str, BLEDevice] = {}
+        self.__advertisements: dict[str, SmartBedAdvertisement] = {}
+
+    @property
+    def advertisements(self) -> list[SmartBedAdvertisement]:
+        """The beds found by the scans so far."""
+        return list(self.__advertisements.values())
+
+    async def scan(self, timeout: float | None = None) -> list[SmartBedAdvertisement]:
+        """Listen for Smart Bed advertisements and return the beds heard."""
+        discovered = await BleakScanner.discover(self.scan_timeout if timeout is None else timeout, return_adv=True)
+        found = []
+        for ble_device, advertisement_data in discovered.values():
+            advertisement = parse_advertisement(
+                ble_device.address,
+                advertisement_data.local_name or ble_device.name,
+                advertisement_data.rssi,
+                advertisement_data.manufacturer_data,
+            )
+            if advertisement is None:
+                continue
+            self.__ble_devices[ble_device.address.upper()] = ble_device
+            self.__advertisements[ble_device.address.upper()] = advertisement
+            found.append(advertisement)
+        self.logger.debug("Scan found %d beds", len(found))
+        return found
+
+    async def run(self, addresses: Iterable[str], operation: Callable[[SmartBedDevice], Awaitable[Any]]) -> list[BatchResult]:
+        """Run `operation` on the bed at each address, returning the results in the same order."""
+        addresses = [address.upper() for address in addresses]
+        if any(address not in self.__ble_devices for address in addresses):
+            await self.scan()
+        semaphore = asyncio.Semaphore(self.concurrency)
+        return await asyncio.gather(*(self.__run_one(address, operation, semaphore) for address in addresses))
+
+    async def __run_one(self, address: str, operation: Callable[[SmartBedDevice], Awaitable[Any]],
+                        semaphore: asyncio.Semaphore) -> BatchResult:
+        if (ble_device := self.__ble_devices.get(address)) is None:
+            return BatchResult(address, error="Not found in the scan")
+        result = BatchResult(address, ble_device.name)
+        async with semaphore:
+            device = SmartBedDevice(self.logger, ble_device)
+            start = time.monotonic()
+            try:
+                result.result = await asyncio.wait_for(operation(device), self.timeout)
+                result.ok = True
+            except asyncio.TimeoutError:
+                result.error = f"Timed out after {self.timeout}s"
+            except Exception as err:
+                result.error = str(err) or type(err).__name__
+            finally:
+                result.elapsed = time.monotonic() - start
+                try:
+                    await device.disconnect()
+                except Exception as err:
+                    self.logger.debug("%s: disconnect failed: %s", address, err)
+        self.logger.debug("%s: %s in %.2fs", address, "done" if result.ok else result.error, result.elapsed)
+        return result
@@ -0,0 +1,219 @@
+"""Latency benchmarks of the Smart Bed device code against simulated beds.
+
+Install the library with `pip install .` in the repository root, run e.g.
+
+    python -m smart_bed_device.benchmark --beds 4 --att-latency 0.03
+
+and compare the numbers before and after a change. Durations are in
+seconds, `--json` prints them machine readable. The tests in `tests/` run
+the same simulated beds and fail on latency regressions.
+"""
+
+from __future__ import annotations
+import argparse
+import asyncio
+import json
+import logging
+import time
+from typing import Awaitable
+from .const import MOTOR_COMMAND_INTERVAL, MOTOR_HEAD
+from .simulator import SimulatedAdapter, SimulatedBed
+from .smart_bed_device import SmartBedDevice
+
+_LOGGER = logging.getLogger(__name__)
+
+
+def summarize(samples: list[float]) -> dict[str, float | int | None]:
+    """Count, mean and percentiles of `samples`, in seconds."""
+    if not samples:
+        return {"count": 0, "mean": None, "p50": None, "p95": None, "max": None}
+    ordered = sorted(samples)
+
+    def percentile(fraction: float) -> float:
+        return ordered[min(int(fraction * len(ordered)), len(ordered) - 1)]
+
+    return {
+        "count": len(ordered),
+        "mean": sum(ordered) / len(ordered),
+        "p50": percentile(0.5),
+        "p95": percentile(0.95),
+        "max": ordered[-1],
+    }
+
+
+def simulated_device(bed: SimulatedBed) -> SmartBedDevice:
+    device = SmartBedDevice(_LOGGER, bed.ble_device)
+    device.connection.client_factory = bed.connect
+    return device
+
+
+async def _attempt(awaitable: Awaitable) -> bool:
+    """Await `awaitable`, returning whether it succeeded on the simulated link."""
+    try:
+        await awaitable
+    except Exception as err:
+        _LOGGER.debug("Simulated operation failed: %s", err)
+        return False
+    return True
+
+
+async def bench_press_latency(options: argparse.Namespace) -> dict:
+    """Seconds from a button press to the first motor command arriving at the bed."""
+    results = {}
+    for mode in ("cold", "warm"):
+        bed = SimulatedBed(**options.bed)
+        device = simulated_device(bed)
+        await _attempt(device.update_device_info())
+        samples = []
+        failures = 0
+        for _ in range(options.repeat):
+            if mode == "cold":
+                await device.connection.disconnect()
+            start = time.monotonic()
+            if not await _attempt(device.up(duration=MOTOR_COMMAND_INTERVAL)):
+                failures += 1
+            elif writes := bed.motor_writes(since=start):
+                samples.append(writes[0].time - start)
+        await device.disconnect()
+        results[mode] = {**summarize(samples), "failures": failures}
+    return results
+
+
+async def bench_refresh(options: argparse.Namespace) -> dict:
+    """Seconds a refresh of all state characteristics takes."""
+    results = {}
+    for mode in ("cold", "warm"):
+        bed = SimulatedBed(**options.bed)
+        device = simulated_device(bed)
+        await _attempt(device.update_device_info())
+        samples = []
+        failures = 0
+        for _ in range(options.repeat):
+            if mode == "cold":
+                await device.connection.disconnect()
+            start = time.monotonic()
+            if await _attempt(device.update_device_data()):
+                samples.append(time.monotonic() - start)
+            else:
+                failures += 1
+        await device.disconnect()
+        results[mode] = {**summarize(samples), "failures": failures}
+    return results
+
+
+async def bench_cadence(options: argparse.Namespace) -> dict:
+    """How evenly the motor commands of a long move arrive at the bed."""
+    bed = SimulatedBed(**options.bed)
+    device = simulated_device(bed)
+    await _attempt(device.update_device_info())
+    start = time.monotonic()
+    completed = await _attempt(device.move(MOTOR_HEAD, True, options.move))
+    await device.disconnect()
+    arrivals = [write.time for write in bed.motor_writes(since=start)]
+    deviations = [
+        abs(later - earlier - MOTOR_COMMAND_INTERVAL)
+        for earlier, later in zip(arrivals, arrivals[1:])
+    ]
+    statistics = device.last_move_statistics
+    return {
+        "completed": completed,
+        "expected_writes": round(options.move / MOTOR_COMMAND_INTERVAL),
+        "received_writes": len(arrivals),
+        "deviation": summarize(deviations),
+        "stream": statistics.as_dict() if statistics else None,
+        "timings": device.timings.as_dict(),
+    }
+
+
+async def bench_shared_adapter(options: argparse.Namespace) -> dict:
+    """Refresh `--beds` beds on one adapter at once, from cold connections."""
+    adapter = SimulatedAdapter(connect_slots=options.connect_slots)
+    beds = [
+        SimulatedBed(**{**options.bed, "address": f"00:00:00:00:00:{index + 1:02X}", "adapter": adapter})
+        for index in range(options.beds)
+    ]
+    devices = [simulated_device(bed) for bed in beds]
+
+    async def refresh(device: SmartBedDevice) -> float | None:
+        start = time.monotonic()
+        if not await _attempt(device.update_device_data()):
+            return None
+        return time.monotonic() - start
+
+    start = time.monotonic()
+    durations = await asyncio.gather(*(refresh(device) for device in devices))
+    elapsed = time.monotonic() - start
+    for device in devices:
+        await device.disconnect()
+    samples = [duration for duration in durations if duration is not None]
+    return {
+        "beds": options.beds,
+        "elapsed": elapsed,
+        "failures": len(durations) - len(samples),
+        "per_bed": summarize(samples),
+    }
+
+
+BENCHMARKS = {
+    "press_latency": bench_press_latency,
+    "refresh": bench_refresh,
+    "cadence": bench_cadence,
+    "shared_adapter": bench_shared_adapter,
+}
+
+
+async def run(options: argparse.Namespace) -> dict[str, dict]:
+    results = {}
+    for name in options.benchmarks or BENCHMARKS:
+        _LOGGER.info("Running %s", name)
+        results[name] = await BENCHMARKS[name](options)
+    return results
+
+
+def _print_results(results: dict, indent: int = 0) -> None:
+    for key, value in results.items():
+        if isinstance(value, dict):
+            print(f"{' ' * indent}{key}:")
+            _print_results(value, indent + 2)
+        elif isinstance(value, float):
+            print(f"{' ' * indent}{key}: {value:.4f}")
+        else:
+            print(f"{' ' * indent}{key}: {value}")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("benchmarks", nargs="*", metavar="benchmark",
+                        help=f"benchmarks to run: {', '.join(BENCHMARKS)} (default: all)")
+    parser.add_argument("--repeat", type=int, default=10, help="samples per measurement")
+    parser.add_argument("--beds", type=int, default=4, help="beds sharing one adapter")
+    parser.add_argument("--connect-slots", type=int, default=2, help="concurrent connects per adapter")
+    parser.add_argument("--move", type=float, default=3.0, help="seconds of the cadence move")
+    parser.add_argument("--connect-latency", type=float, default=0.5, help="seconds per connect")
+    parser.add_argument("--att-latency", type=float, default=0.03, help="seconds per ATT round trip")
+    parser.add_argument("--packet-loss", type=float, default=0.0, help="probability an ATT packet is lost")
+    parser.add_argument("--disconnect-rate", type=float, default=0.0, help="probability an ATT operation drops the link")
+    parser.add_argument("--seed", type=int, default=None, help="seed of the simulated losses")
+    parser.add_argument("--json", action="store_true", help="print the results as JSON")
+    parser.add_argument("--debug", action="store_true", help="log the device code")
+    options = parser.parse_args()
+    if unknown := set(options.benchmarks) - set(BENCHMARKS):
+        parser.error(f"unknown benchmarks: {', '.join(sorted(unknown))}")
+    options.bed = {
+        "connect_latency": options.connect_latency,
+        "att_latency": options.att_latency,
+        "packet_loss": options.packet_loss,
+        "disconnect_rate": options.disconnect_rate,
+        "seed": options.seed,
+    }
+    logging.basicConfig(level=logging.DEBUG if options.debug else logging.WARNING)
+
+    results = asyncio.run(run(options))
+    if options.json:
+        print(json.dumps(results, indent=2))
+    else:
+        _print_results(results)
+
+
+if __name__ == "__main__":
+    main()
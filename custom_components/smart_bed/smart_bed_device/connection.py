@@ -0,0 +1,294 @@
+"""Pooled BLE connection for the Smart Bed device."""
+
+from __future__ import annotations
+import asyncio
+import time
+from contextlib import asynccontextmanager
+from logging import Logger
+from typing import AsyncContextManager, AsyncIterator, Awaitable, Callable
+from .health import DeviceHealth
+from .const import (
+    DEFAULT_IDLE_TIMEOUT,
+    PRIORITY_BACKGROUND,
+    PRIORITY_NORMAL,
+    RECONNECT_DELAY,
+    TIMING_CONNECT,
+    TIMING_CONNECT_WAIT,
+)
+from .timing import OperationTimings
+from bleak import BleakClient
+from bleak.backends.device import BLEDevice
+from bleak_retry_connector import establish_connection
+
+
+class SmartBedConnection:
+    """Keep a single BleakClient alive between calls and hand it out to callers.
+
+    The client is reused while it is in use or idle for less than
+    `idle_timeout` seconds, so warm calls skip the connect and service
+    discovery. Connection setup and teardown are serialized with a lock.
+    While the connection is held (e.g. for notifications) it is
+    re-established as soon as it drops.
+
+    `connect_slot` can be set to a function returning an async context
+    manager for a given priority, which is entered around every connect
+    attempt. It lets a caller that manages several devices limit concurrent
+    connects per adapter and let commands go before background work.
+    """
+    connect_count: int = 0
+    reuse_count: int = 0
+    drop_count: int = 0
+    last_connect_time: float | None = None
+    total_connect_time: float = 0.0
+    prewarm_count: int = 0
+    prewarm_hits: int = 0
+    prewarm_wasted: int = 0
+
+    def __init__(self, logger: Logger, ble_device: BLEDevice, idle_timeout: float = DEFAULT_IDLE_TIMEOUT):
+        self.logger = logger
+        self.idle_timeout = idle_timeout
+        self.__ble_device = ble_device
+        self.__client: BleakClient | None = None
+        self.__lock = asyncio.Lock()
+        self.__users: int = 0
+        self.__idle_handle: asyncio.TimerHandle | None = None
+        self.__holds: int = 0
+        self.__reconnect_task: asyncio.Task | None = None
+        self.__connect_callbacks: list[Callable[[BleakClient], Awaitable[None]]] = []
+        self.__disconnect_callbacks: list[Callable[[], None]] = []
+        self.__prewarmed: bool = False
+        self.connect_slot: Callable[[int], AsyncContextManager[None]] | None = None
+        self.client_factory: Callable[[BLEDevice, Callable[[BleakClient], None]], Awaitable[BleakClient]] | None = None
+        self.health = DeviceHealth()
+        self.timings = OperationTimings()
+
+    @property
+    def ble_device(self) -> BLEDevice:
+        return self.__ble_device
+
+    def set_ble_device(self, ble_device: BLEDevice) -> None:
+        """Use a newer BLEDevice (e.g. from a fresher advertisement) for the next connect."""
+        self.__ble_device = ble_device
+
+    @property
+    def is_connected(self) -> bool:
+        return self.__client is not None and self.__client.is_connected
+
+    @property
+    def mean_connect_time(self) -> float | None:
+        if not self.connect_count:
+            return None
+        return self.total_connect_time / self.connect_count
+
+    @property
+    def prewarm_hit_rate(self) -> float | None:
+        """Fraction of the settled prewarms that a command used."""
+        settled = self.prewarm_hits + self.prewarm_wasted
+        return self.prewarm_hits / settled if settled else None
+
+    @property
+    def statistics(self) -> dict[str, float | int | None]:
+        """Return the connect-latency and reuse counters."""
+        return {
+            "connect_count": self.connect_count,
+            "reuse_count": self.reuse_count,
+            "drop_count": self.drop_count,
+            "last_connect_time": self.last_connect_time,
+            "mean_connect_time": self.mean_connect_time,
+            "failure_count": self.health.failure_count,
+            "consecutive_failures": self.health.consecutive_failures,
+            "prewarm_count": self.prewarm_count,
+            "prewarm_hits": self.prewarm_hits,
+            "prewarm_wasted": self.prewarm_wasted,
+            "prewarm_hit_rate": self.prewarm_hit_rate,
+        }
+
+    def __on_disconnect(self, client: BleakClient) -> None:
+        if client is not self.__client:
+            return
+        self.__client = None
+        self.drop_count += 1
+        self.__settle_prewarm(used=False)
+        self.__fire_disconnect_callbacks()
+        if self.__holds and self.__reconnect_task is None:
+            self.logger.debug("%s: connection dropped, reconnecting", self.__ble_device.address)
+            self.__reconnect_task = asyncio.ensure_future(self.__reconnect())
+        else:
+            self.logger.debug("%s: connection dropped, reconnecting on next use", self.__ble_device.address)
+
+    async def __reconnect(self) -> None:
+        try:
+            while self.__holds and not self.is_connected:
+                try:
+                    async with self.__connect_slot(PRIORITY_BACKGROUND):
+                        async with self.__lock:
+                            if self.__holds and not self.is_connected:
+                                self.__client = await self.__connect()
+                except Exception as err:
+                    self.logger.debug("%s: reconnect failed: %s", self.__ble_device.address, err)
+                    await asyncio.sleep(RECONNECT_DELAY)
+        finally:
+            self.__reconnect_task = None
+
+    @asynccontextmanager
+    async def __connect_slot(self, priority: int) -> AsyncIterator[None]:
+        # Checked once per attempt, it lets a due probe through only once
+        self.health.check()
+        if self.connect_slot is None:
+            yield
+            return
+        wait = time.perf_counter()
+        async with self.connect_slot(priority):
+            self.timings.record(TIMING_CONNECT_WAIT, time.perf_counter() - wait)
+            yield
+
+    async def __connect(self) -> BleakClient:
+        try:
+            client = await self.__establish()
+        except Exception:
+            self.health.record_failure()
+            raise
+        self.health.record_success()
+        return client
+
+    async def __establish(self) -> BleakClient:
+        start = time.monotonic()
+        with self.timings.span(TIMING_CONNECT):
+            if self.client_factory is not None:
+                client = await self.client_factory(self.__ble_device, self.__on_disconnect)
+            else:
+                client = await establish_connection(
+                    BleakClient,
+                    self.__ble_device,
+                    self.__ble_device.address,
+                    disconnected_callback=self.__on_disconnect,
+                )
+        self.last_connect_time = time.monotonic() - start
+        self.total_connect_time += self.last_connect_time
+        self.connect_count += 1
+        self.logger.debug("%s: connected in %.2fs", self.__ble_device.address, self.last_connect_time)
+        for callback in self.__connect_callbacks:
+            try:
+                await callback(client)
+            except Exception as err:
+                self.logger.warning("%s: connect callback failed: %s", self.__ble_device.address, err)
+        return client
+
+    def add_connect_callback(self, callback: Callable[[BleakClient], Awaitable[None]]) -> Callable[[], None]:
+        """Run `callback` with every newly established client. Returns a remove function."""
+        self.__connect_callbacks.append(callback)
+        return lambda: self.__connect_callbacks.remove(callback)
+
+    def add_disconnect_callback(self, callback: Callable[[], None]) -> Callable[[], None]:
+        """Call `callback` whenever the client goes away, dropped or closed. Returns a remove function."""
+        self.__disconnect_callbacks.append(callback)
+        return lambda: self.__disconnect_callbacks.remove(callback)
+
+    def __fire_disconnect_callbacks(self) -> None:
+        for callback in list(self.__disconnect_callbacks):
+            callback()
+
+    async def __acquire(self, priority: int) -> BleakClient:
+        async with self.__lock:
+            if self.__reuse(priority):
+                return self.__client
+        # The connect slot is waited for without the lock, so a command isn't
+        # queued behind a background connect of the same device
+        async with self.__connect_slot(priority):
+            async with self.__lock:
+                if not self.__reuse(priority):
+                    self.__cancel_idle_timer()
+                    self.__client = await self.__connect()
+                    self.__users += 1
+                return self.__client
+
+    def __reuse(self, priority: int) -> bool:
+        """Take a user of the pooled client if it is still connected."""
+        if not self.is_connected:
+            return False
+        self.__cancel_idle_timer()
+        self.reuse_count += 1
+        if priority < PRIORITY_BACKGROUND:
+            self.__settle_prewarm(used=True)
+        self.__users += 1
+        return True
+
+    def __release(self, idle_timeout: float | None = None) -> None:
+        self.__users = max(self.__users - 1, 0)
+        if self.__users == 0 and self.__client is not None:
+            self.__idle_handle = asyncio.get_running_loop().call_later(
+                self.idle_timeout if idle_timeout is None else idle_timeout,
+                lambda: asyncio.ensure_future(self.__disconnect_idle()),
+            )
+
+    def __settle_prewarm(self, used: bool) -> None:
+        if not self.__prewarmed:
+            return
+        self.__prewarmed = False
+        if used:
+            self.prewarm_hits += 1
+        else:
+            self.prewarm_wasted += 1
+
+    async def prewarm(self, window: float) -> bool:
+        """Connect in the background and keep the idle link for `window` seconds.
+
+        Returns whether a connection was made, False if one was already up.
+        """
+        if self.is_connected:
+            return False
+        connects = self.connect_count
+        await self.__acquire(PRIORITY_BACKGROUND)
+        if prewarmed := self.connect_count != connects:
+            self.prewarm_count += 1
+            self.__prewarmed = True
+        self.__release(window if prewarmed else None)
+        return prewarmed
+
+    def __cancel_idle_timer(self) -> None:
+        if self.__idle_handle is not None:
+            self.__idle_handle.cancel()
+            self.__idle_handle = None
+
+    async def __disconnect_idle(self) -> None:
+        async with self.__lock:
+            self.__idle_handle = None
+            if self.__users == 0:
+                await self.__disconnect()
+
+    async def __disconnect(self) -> None:
+        # Clearing the client first makes __on_disconnect ignore our own disconnect
+        client, self.__client = self.__client, None
+        self.__settle_prewarm(used=False)
+        if client is not None:
+            self.__fire_disconnect_callbacks()
+            await client.disconnect()
+
+    @asynccontextmanager
+    async def session(self, priority: int = PRIORITY_NORMAL) -> AsyncIterator[BleakClient]:
+        """Yield a connected client, connecting only if the pooled one is gone."""
+        client = await self.__acquire(priority)
+        try:
+            yield client
+        finally:
+            self.__release()
+
+    async def hold(self, priority: int = PRIORITY_BACKGROUND) -> BleakClient:
+        """Connect and keep the connection open until `unhold()` is called."""
+        client = await self.__acquire(priority)
+        self.__holds += 1
+        return client
+
+    def unhold(self) -> None:
+        self.__holds -= 1
+        self.__release()
+
+    async def disconnect(self) -> None:
+        """Drop the pooled client now, e.g. when the integration is unloaded."""
+        self.__holds = 0
+        self.__users = 0
+        if self.__reconnect_task is not None:
+            self.__reconnect_task.cancel()
+        async with self.__lock:
+            self.__cancel_idle_timer()
+            await self.__disconnect()
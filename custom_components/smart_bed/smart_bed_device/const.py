@@ -1,6 +1,8 @@
 """Constants for the Smart Bed device."""
 
 # Smart Bed device: VMAT-BASIC-RF
+MANUFACTURER_ID = 944
+
 MANUFACTURER_NAME_STRING_CHARACTERISTIC = "00002a29-0000-1000-8000-00805f9b34fb"
 MODEL_NUMBER_STRING_CHARACTERISTIC = "00002a24-0000-1000-8000-00805f9b34fb"
 FIRMWARE_REVISION_STRING_CHARACTERISTIC = "00002a26-0000-1000-8000-00805f9b34fb"
@@ -13,6 +15,13 @@ MOTOR_STATUS_CHARACTERISTIC = "00001531-9f03-0de5-96c5-b8f4f3081186"
 CHIP_TEMP_CHARACTERISTIC = "00001532-9f03-0de5-96c5-b8f4f3081186"
 SERVICE_IF_CHARACTERISTIC = "00001533-9f03-0de5-96c5-b8f4f3081186"
 
+# Seconds between motor command writes, the motor stops when they stop arriving
+MOTOR_COMMAND_INTERVAL = 0.1
+
+MOTOR_BED = "bed"
+MOTOR_HEAD = "head"
+MOTOR_LEGS = "legs"
+
 MOTOR_COMMAND_DOWN = b'\x00'
 MOTOR_COMMAND_UP = b'\x10'
 MOTOR_COMMAND_RANGE_DURATION = 20       # TODO: Measure the correct value
@@ -24,3 +33,54 @@ MOTOR_COMMAND_HEAD_RANGE_DURATION = 20  # TODO: Measure the correct value
 MOTOR_COMMAND_LEGS_DOWN = b'\x08'
 MOTOR_COMMAND_LEGS_UP = b'\x09'
 MOTOR_COMMAND_LEGS_RANGE_DURATION = 20  # TODO: Measure the correct value
+
+# Seconds an unused connection is kept open before it is dropped
+DEFAULT_IDLE_TIMEOUT = 30
+
+# Seconds between reconnect attempts while a connection is held
+RECONNECT_DELAY = 10
+
+# (down, up) commands and range duration of each motor
+MOTOR_COMMANDS = {
+    MOTOR_BED: (MOTOR_COMMAND_DOWN, MOTOR_COMMAND_UP),
+    MOTOR_HEAD: (MOTOR_COMMAND_HEAD_DOWN, MOTOR_COMMAND_HEAD_UP),
+    MOTOR_LEGS: (MOTOR_COMMAND_LEGS_DOWN, MOTOR_COMMAND_LEGS_UP),
+}
+MOTOR_RANGE_DURATIONS = {
+    MOTOR_BED: MOTOR_COMMAND_RANGE_DURATION,
+    MOTOR_HEAD: MOTOR_COMMAND_HEAD_RANGE_DURATION,
+    MOTOR_LEGS: MOTOR_COMMAND_LEGS_RANGE_DURATION,
+}
+
+# Motor action priorities, lower runs first
+PRIORITY_PREEMPT = 0
+PRIORITY_NORMAL = 10
+PRIORITY_BACKGROUND = 20
+
+# What to do with an action for a motor while another motor is moving
+CONFLICT_QUEUE = "queue"
+CONFLICT_REJECT = "reject"
+
+# Seconds a single characteristic read may take
+READ_TIMEOUT = 5
+
+# Consecutive connect failures after which a device is considered unavailable
+BREAKER_THRESHOLD = 3
+# Seconds between probes of an unavailable device, doubling up to the maximum
+BREAKER_BACKOFF_MIN = 30
+BREAKER_BACKOFF_MAX = 900
+
+# Durations kept per timed operation for the rolling percentiles
+TIMING_WINDOW = 256
+TIMING_CONNECT_WAIT = "connect_wait"
+TIMING_CONNECT = "connect"
+TIMING_READ = "read"
+TIMING_WRITE = "write"
+TIMING_REFRESH = "refresh"
+TIMING_MOTOR_ACTION = "motor_action"
+
+# Beds handled at once by a batch, and seconds each one may take
+DEFAULT_BATCH_CONCURRENCY = 3
+DEFAULT_BATCH_TIMEOUT = 60
+# Seconds a scan listens for advertisements
+DEFAULT_SCAN_TIMEOUT = 10
@@ -0,0 +1,17 @@
+"""Exceptions for the Smart Bed device."""
+
+
+class SmartBedError(Exception):
+    """Base error of the Smart Bed device."""
+
+
+class SmartBedBusyError(SmartBedError):
+    """A motor action was rejected because another motor is moving."""
+
+
+class SmartBedUnavailableError(SmartBedError):
+    """The device failed too often and is not tried again until its backoff passed."""
+
+
+class SmartBedProgramError(SmartBedError, ValueError):
+    """A motion program definition is invalid."""
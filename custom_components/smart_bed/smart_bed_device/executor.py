@@ -0,0 +1,192 @@
+"""Motor command executor for the Smart Bed device."""
+
+from __future__ import annotations
+import asyncio
+import itertools
+from dataclasses import dataclass, field
+from logging import Logger
+from typing import Callable, Iterable
+from .connection import SmartBedConnection
+from .const import CONFLICT_QUEUE, CONFLICT_REJECT, PRIORITY_NORMAL, PRIORITY_PREEMPT, TIMING_MOTOR_ACTION
+from .exceptions import SmartBedBusyError
+from .stream import MotorCommandStream, MotorStreamStatistics
+from .timing import OperationTimings
+
+
+@dataclass(order=True)
+class MotorAction:
+    """A sequence of steps, each mapping the commands to stream in parallel to their duration.
+
+    A step can also be a pause in seconds, during which the connection is
+    kept. `progress` is called with the index of each step as it starts,
+    and with the number of steps when the action completed.
+    """
+    priority: int
+    sequence: int
+    motors: frozenset[str] = field(compare=False)
+    steps: list[dict[bytes, float] | float] = field(compare=False)
+    future: asyncio.Future = field(compare=False)
+    progress: Callable[[int], None] | None = field(default=None, compare=False)
+
+
+class MotorCommandExecutor:
+    """Run motor actions of one device one at a time.
+
+    A new action for a moving motor preempts the running one, or extends it
+    when it is the same command. The same command is also merged into an
+    action that is still connecting or queued, instead of restarting it.
+    Actions for other motors are queued or rejected depending on
+    `conflict_policy`. `stop()` cancels the running stream before its next
+    write.
+
+    Callbacks are called with the command when a stream starts, and with the
+    command and the seconds it ran when the stream ends.
+    """
+    last_move_statistics: MotorStreamStatistics | None = None
+
+    def __init__(self, logger: Logger, connection: SmartBedConnection, conflict_policy: str = CONFLICT_QUEUE):
+        self.logger = logger
+        self.conflict_policy = conflict_policy
+        self.__connection = connection
+        self.__queue: asyncio.PriorityQueue[MotorAction] = asyncio.PriorityQueue()
+        self.__sequence = itertools.count()
+        self.__worker: asyncio.Task | None = None
+        self.__active: MotorAction | None = None
+        self.__active_task: asyncio.Task | None = None
+        self.__stream: MotorCommandStream | None = None
+        self.__queued: list[MotorAction] = []
+        self.__connecting: bool = False
+        self.__callbacks: list[Callable[[bytes, float | None], None]] = []
+
+    @property
+    def active_motors(self) -> frozenset[str]:
+        return self.__active.motors if self.__active else frozenset()
+
+    @property
+    def active_commands(self) -> list[bytes]:
+        return self.__stream.commands if self.__stream else []
+
+    def register_callback(self, callback: Callable[[bytes, float | None], None]) -> Callable[[], None]:
+        self.__callbacks.append(callback)
+        return lambda: self.__callbacks.remove(callback)
+
+    def __fire_callbacks(self, command: bytes, elapsed: float | None) -> None:
+        for callback in list(self.__callbacks):
+            callback(command, elapsed)
+
+    async def submit(self, motors: Iterable[str], steps: list[dict[bytes, float] | float], priority: int = PRIORITY_NORMAL,
+                     progress: Callable[[int], None] | None = None) -> None:
+        """Run `steps` on `motors` and wait until they finished, were merged or were stopped."""
+        motors = frozenset(motors)
+        active = self.__active
+        preempt = active is not None and not active.motors.isdisjoint(motors)
+        if preempt:
+            stream = self.__stream
+            if (len(steps) == 1 and len(active.steps) == 1 and stream is not None
+                    and isinstance(steps[0], dict) and set(steps[0]) <= set(stream.commands)):
+                for command, duration in steps[0].items():
+                    stream.extend(command, duration)
+                await asyncio.shield(active.future)
+                return
+            # Still connecting, so a repeated press doesn't restart the connect
+            if self.__connecting and self.__merge(active, steps):
+                await asyncio.shield(active.future)
+                return
+            priority = min(priority, PRIORITY_PREEMPT)
+        else:
+            for queued in self.__queued:
+                if not queued.motors.isdisjoint(motors) and self.__merge(queued, steps):
+                    await asyncio.shield(queued.future)
+                    return
+            if active is not None and self.conflict_policy == CONFLICT_REJECT:
+                raise SmartBedBusyError(f"Motors {', '.join(sorted(active.motors))} are moving")
+
+        action = MotorAction(
+            priority, next(self.__sequence), motors, steps, asyncio.get_running_loop().create_future(), progress
+        )
+        self.__queue.put_nowait(action)
+        self.__queued.append(action)
+        if preempt:
+            self.__cancel_active()
+        if self.__worker is None or self.__worker.done():
+            self.__worker = asyncio.ensure_future(self.__work())
+        await asyncio.shield(action.future)
+
+    @staticmethod
+    def __merge(action: MotorAction, steps: list[dict[bytes, float] | float]) -> bool:
+        """Fold a single step of commands `action` already has into it, before it streams them."""
+        if len(steps) != 1 or len(action.steps) != 1:
+            return False
+        step, pending = steps[0], action.steps[0]
+        if not isinstance(step, dict) or not isinstance(pending, dict) or not set(step) <= set(pending):
+            return False
+        action.steps[0] = {command: max(duration, step.get(command, 0.0)) for command, duration in pending.items()}
+        return True
+
+    async def stop(self) -> None:
+        """Stop the running action and drop everything that is queued."""
+        while not self.__queue.empty():
+            self.__finish(self.__queue.get_nowait())
+        self.__queued.clear()
+        self.__cancel_active()
+
+    def __cancel_active(self) -> None:
+        if self.__active_task is not None:
+            self.__active_task.cancel()
+
+    @staticmethod
+    def __finish(action: MotorAction, err: BaseException | None = None) -> None:
+        if action.future.done():
+            return
+        if err is None:
+            action.future.set_result(None)
+        else:
+            action.future.set_exception(err)
+
+    async def __work(self) -> None:
+        while not self.__queue.empty():
+            action = self.__queue.get_nowait()
+            self.__queued.remove(action)
+            self.__active = action
+            self.__active_task = asyncio.ensure_future(self.__execute(action))
+            try:
+                await asyncio.wait([self.__active_task])
+                if self.__active_task.cancelled():
+                    self.logger.debug("Motor action on %s was stopped", ", ".join(sorted(action.motors)))
+                    self.__finish(action)
+                else:
+                    self.__finish(action, self.__active_task.exception())
+            finally:
+                self.__active = None
+                self.__active_task = None
+                self.__stream = None
+                self.__connecting = False
+
+    async def __execute(self, action: MotorAction) -> None:
+        timings = self.__connection.timings
+        with timings.span(TIMING_MOTOR_ACTION):
+            await self.__run_steps(action, timings)
+
+    async def __run_steps(self, action: MotorAction, timings: OperationTimings) -> None:
+        self.__connecting = True
+        async with self.__connection.session() as client:
+            self.__connecting = False
+            for index, step in enumerate(action.steps):
+                if action.progress is not None:
+                    action.progress(index)
+                if not isinstance(step, dict):
+                    await asyncio.sleep(step)
+                    continue
+                stream = self.__stream = MotorCommandStream(client, step, timings=timings)
+                for command in step:
+                    self.__fire_callbacks(command, None)
+                try:
+                    await stream.run()
+                finally:
+                    self.__stream = None
+                    self.last_move_statistics = stream.statistics
+                    self.logger.debug("Motor commands %s: %s", b"".join(step).hex(), stream.statistics.as_dict())
+                    for command in stream.ticks:
+                        self.__fire_callbacks(command, stream.run_time(command))
+            if action.progress is not None:
+                action.progress(len(action.steps))
@@ -0,0 +1,75 @@
+"""Connection health tracking for the Smart Bed device."""
+
+from __future__ import annotations
+import random
+import time
+from .const import BREAKER_BACKOFF_MAX, BREAKER_BACKOFF_MIN, BREAKER_THRESHOLD
+from .exceptions import SmartBedUnavailableError
+
+
+class DeviceHealth:
+    """Circuit breaker over the connect attempts of one device.
+
+    After `threshold` consecutive failures the breaker opens and connects
+    fail fast with SmartBedUnavailableError. One probe is let through after
+    a jittered, exponentially growing backoff, or sooner after `probe_now()`
+    (e.g. when the device was heard advertising).
+    """
+    consecutive_failures: int = 0
+    failure_count: int = 0
+    last_success: float | None = None
+    last_success_timestamp: float | None = None
+    last_failure: float | None = None
+
+    def __init__(self, threshold: int = BREAKER_THRESHOLD,
+                 backoff_min: float = BREAKER_BACKOFF_MIN, backoff_max: float = BREAKER_BACKOFF_MAX):
+        self.threshold = threshold
+        self.backoff_min = backoff_min
+        self.backoff_max = backoff_max
+        self.__retry_at: float = 0.0
+
+    @property
+    def is_open(self) -> bool:
+        return self.consecutive_failures >= self.threshold
+
+    @property
+    def last_success_age(self) -> float | None:
+        return None if self.last_success is None else time.monotonic() - self.last_success
+
+    def check(self) -> None:
+        """Raise SmartBedUnavailableError if a connect shouldn't be attempted now."""
+        if not self.is_open:
+            return
+        if (wait := self.__retry_at - time.monotonic()) > 0:
+            raise SmartBedUnavailableError(
+                f"Device unreachable after {self.consecutive_failures} attempts, next probe in {wait:.0f}s"
+            )
+        # Let this attempt through as the probe; further ones wait for its result
+        self.__schedule_retry()
+
+    def probe_now(self) -> bool:
+        """Shorten the backoff, e.g. because the device was heard advertising.
+
+        The next probe is allowed `backoff_min` after the last failure at the
+        latest. Returns whether a probe is allowed now.
+        """
+        if self.last_failure is not None:
+            self.__retry_at = min(self.__retry_at, self.last_failure + self.backoff_min)
+        return self.__retry_at <= time.monotonic()
+
+    def record_success(self) -> None:
+        self.consecutive_failures = 0
+        self.last_success = time.monotonic()
+        self.last_success_timestamp = time.time()
+
+    def record_failure(self) -> None:
+        self.consecutive_failures += 1
+        self.failure_count += 1
+        self.last_failure = time.monotonic()
+        if self.is_open:
+            self.__schedule_retry()
+
+    def __schedule_retry(self) -> None:
+        exponent = max(self.consecutive_failures - self.threshold, 0)
+        backoff = min(self.backoff_min * 2 ** exponent, self.backoff_max)
+        self.__retry_at = time.monotonic() + random.uniform(backoff / 2, backoff)
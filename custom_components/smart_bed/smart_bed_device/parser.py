@@ -0,0 +1,35 @@
+"""Parser for Smart Bed BLE advertisements."""
+
+from __future__ import annotations
+from dataclasses import dataclass
+from .const import MANUFACTURER_ID
+
+
+@dataclass(frozen=True, slots=True)
+class SmartBedAdvertisement:
+    """What a Smart Bed tells about itself without a connection."""
+    address: str
+    name: str | None
+    rssi: int | None
+    manufacturer_data: bytes
+
+
+def parse_advertisement(
+        address: str,
+        name: str | None,
+        rssi: int | None,
+        manufacturer_data: dict[int, bytes],
+        ) -> SmartBedAdvertisement | None:
+    """Parse an advertisement, returning None if it doesn't come from a Smart Bed.
+
+    The layout of the manufacturer payload is not documented, so it is kept
+    as raw bytes; callers can compare it between advertisements.
+    """
+    if MANUFACTURER_ID not in manufacturer_data:
+        return None
+    return SmartBedAdvertisement(
+        address=address,
+        name=name,
+        rssi=rssi,
+        manufacturer_data=bytes(manufacturer_data[MANUFACTURER_ID]),
+    )
@@ -0,0 +1,44 @@
+"""Position estimation for the Smart Bed motors."""
+
+from __future__ import annotations
+
+
+class MotorPosition:
+    """Estimate the position of a motor from how long it was driven.
+
+    The position is in percent of the range, 0 being fully down. It is
+    unknown until the motor was restored or driven through its whole range.
+    """
+    position: float | None = None
+
+    def __init__(self, range_duration: float):
+        self.range_duration = range_duration
+
+    def apply(self, up: bool, seconds: float) -> float | None:
+        """Account for the motor having moved in one direction for `seconds`."""
+        if seconds >= self.range_duration:
+            self.position = 100.0 if up else 0.0
+        elif self.position is not None:
+            delta = 100.0 * seconds / self.range_duration
+            self.position = min(100.0, max(0.0, self.position + (delta if up else -delta)))
+        return self.position
+
+    def plan(self, target: float) -> list[tuple[bool, float]]:
+        """Return the (up, seconds) moves that bring the motor to `target` percent.
+
+        Targets at the end of the range are driven for the whole range so the
+        estimate is re-homed against the end stop. An unknown position is
+        homed at the bottom first.
+        """
+        target = min(100.0, max(0.0, target))
+        if target in (0.0, 100.0):
+            return [(target == 100.0, self.range_duration)]
+        moves = []
+        position = self.position
+        if position is None:
+            moves.append((False, self.range_duration))
+            position = 0.0
+        delta = target - position
+        if delta:
+            moves.append((delta > 0, abs(delta) * self.range_duration / 100.0))
+        return moves
@@ -0,0 +1,138 @@
+"""Motion programs for the Smart Bed device."""
+
+from __future__ import annotations
+from dataclasses import dataclass
+from typing import Any
+from .const import MOTOR_BED, MOTOR_COMMANDS
+from .exceptions import SmartBedProgramError
+
+DIRECTIONS = {"up": True, "down": False}
+# Upper bound of the steps a program may expand to, repeats included
+MAX_PROGRAM_STEPS = 1000
+
+
+@dataclass(frozen=True, slots=True)
+class MotionStep:
+    """Drive the motors of `moves` (motor, up) together for `duration` seconds.
+
+    A step without moves is a pause. Moves without a duration drive their
+    motors through the whole range.
+    """
+    moves: tuple[tuple[str, bool], ...] = ()
+    duration: float | None = None
+
+
+@dataclass(frozen=True, slots=True)
+class MotionProgram:
+    """A named sequence of motion steps, run `repeat` times."""
+    name: str
+    steps: tuple[MotionStep, ...]
+    repeat: int = 1
+
+    @property
+    def motors(self) -> frozenset[str]:
+        return frozenset(motor for step in self.steps for motor, _ in step.moves)
+
+    def compile(self, range_durations: dict[str, float]) -> list[dict[bytes, float] | float]:
+        """Return the executor steps: the commands to stream with their durations, or a pause in seconds."""
+        compiled: list[dict[bytes, float] | float] = []
+        for step in self.steps:
+            if not step.moves:
+                compiled.append(float(step.duration))
+                continue
+            compiled.append({
+                MOTOR_COMMANDS[motor][up]: range_durations[motor] if step.duration is None else step.duration
+                for motor, up in step.moves
+            })
+        return compiled * self.repeat
+
+
+def step_duration(step: dict[bytes, float] | float) -> float:
+    """Seconds a compiled step takes."""
+    return step if isinstance(step, float) else max(step.values())
+
+
+def wave_program(repeat: int = 2) -> MotionProgram:
+    """Drive the bed through its whole range up and down, `repeat` times."""
+    return MotionProgram(
+        "Wave",
+        (MotionStep(((MOTOR_BED, True),)), MotionStep(((MOTOR_BED, False),))),
+        repeat,
+    )
+
+
+def parse_program(name: str, definition: dict[str, Any] | list[dict[str, Any]]) -> MotionProgram:
+    """Build a program from its definition, e.g. as stored in the config entry options.
+
+    A definition is a list of steps, or a mapping with `steps` and an
+    optional `repeat` count. A step is one of
+
+        {"motor": "bed", "direction": "up", "duration": 5}
+        {"motors": {"head": "up", "legs": "down"}, "duration": 5}
+        {"pause": 2}
+        {"repeat": 3, "steps": [...]}
+
+    Raises SmartBedProgramError if the definition is invalid.
+    """
+    if isinstance(definition, list):
+        definition = {"steps": definition}
+    if not isinstance(definition, dict):
+        raise SmartBedProgramError("A program is a list of steps or a mapping with steps")
+    steps = _parse_steps(definition.get("steps"))
+    repeat = _parse_repeat(definition.get("repeat", 1))
+    if len(steps) * repeat > MAX_PROGRAM_STEPS:
+        raise SmartBedProgramError(f"A program may have at most {MAX_PROGRAM_STEPS} steps")
+    return MotionProgram(name, tuple(steps), repeat)
+
+
+def _parse_steps(definitions: Any) -> list[MotionStep]:
+    if not isinstance(definitions, list) or not definitions:
+        raise SmartBedProgramError("Steps must be a non-empty list")
+    steps = []
+    for definition in definitions:
+        if not isinstance(definition, dict):
+            raise SmartBedProgramError(f"Invalid step {definition!r}")
+        if "steps" in definition:
+            inner = _parse_steps(definition["steps"])
+            repeat = _parse_repeat(definition.get("repeat", 1))
+            # Checked before repeating, so a huge count can't allocate the steps
+            if len(steps) + len(inner) * repeat > MAX_PROGRAM_STEPS:
+                raise SmartBedProgramError(f"A program may have at most {MAX_PROGRAM_STEPS} steps")
+            steps.extend(inner * repeat)
+        elif "pause" in definition:
+            steps.append(MotionStep(duration=_parse_duration(definition["pause"])))
+        else:
+            if "motors" in definition:
+                directions = definition["motors"]
+                if not isinstance(directions, dict) or not directions:
+                    raise SmartBedProgramError(f"Invalid motors in step {definition!r}")
+            elif "motor" in definition:
+                directions = {definition["motor"]: definition.get("direction")}
+            else:
+                raise SmartBedProgramError(f"Step {definition!r} has no motor, pause or steps")
+            moves = []
+            for motor, direction in directions.items():
+                if motor not in MOTOR_COMMANDS:
+                    raise SmartBedProgramError(f"Unknown motor {motor!r}")
+                if direction not in DIRECTIONS:
+                    raise SmartBedProgramError(f"Direction of {motor} must be up or down")
+                moves.append((motor, DIRECTIONS[direction]))
+            duration = definition.get("duration")
+            steps.append(MotionStep(tuple(moves), None if duration is None else _parse_duration(duration)))
+    return steps
+
+
+def _parse_duration(value: Any) -> float:
+    try:
+        duration = float(value)
+    except (TypeError, ValueError):
+        raise SmartBedProgramError(f"Invalid duration {value!r}") from None
+    if not 0 < duration <= 600:
+        raise SmartBedProgramError(f"Duration {duration} must be between 0 and 600 seconds")
+    return duration
+
+
+def _parse_repeat(value: Any) -> int:
+    if not isinstance(value, int) or isinstance(value, bool) or value < 1:
+        raise SmartBedProgramError(f"Repeat must be a positive whole number, not {value!r}")
+    return value
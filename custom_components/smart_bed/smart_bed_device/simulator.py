@@ -0,0 +1,258 @@
+"""Simulated Smart Bed for running the device code without hardware.
+
+A `SimulatedBed` emulates the GATT table of the VMAT-BASIC-RF with a
+configurable connect latency, ATT latency, packet loss and link drops.
+Assign its `connect` to `SmartBedConnection.client_factory` to route a
+`SmartBedDevice` to it instead of a real adapter.
+"""
+
+from __future__ import annotations
+import asyncio
+import random
+import time
+from dataclasses import dataclass, field
+from typing import Callable
+from .const import (
+    CHIP_TEMP_CHARACTERISTIC,
+    FACTORY_RESET_CHARACTERISTIC,
+    FIRMWARE_REVISION_STRING_CHARACTERISTIC,
+    FLOOR_LIGHT_CHARACTERISTIC,
+    MANUFACTURER_NAME_STRING_CHARACTERISTIC,
+    MODEL_NUMBER_STRING_CHARACTERISTIC,
+    MOTOR_COMMAND_CHARACTERISTIC,
+    MOTOR_COMMAND_INTERVAL,
+    MOTOR_STATUS_CHARACTERISTIC,
+    SERVICE_IF_CHARACTERISTIC,
+    SOFTWARE_REVISION_STRING_CHARACTERISTIC,
+)
+from bleak.backends.device import BLEDevice
+from bleak.exc import BleakError
+
+
+@dataclass
+class SimulatedCharacteristic:
+    """A characteristic of the simulated GATT table."""
+    uuid: str
+    properties: list[str]
+    value: bytearray = field(default_factory=bytearray)
+
+
+@dataclass
+class SimulatedWrite:
+    """A write that reached the simulated bed."""
+    time: float
+    uuid: str
+    data: bytes
+
+
+def default_gatt_table() -> dict[str, SimulatedCharacteristic]:
+    """The characteristics of the VMAT-BASIC-RF, with plausible values."""
+    characteristics = [
+        SimulatedCharacteristic(MANUFACTURER_NAME_STRING_CHARACTERISTIC, ["read"], bytearray(b"Simulated")),
+        SimulatedCharacteristic(MODEL_NUMBER_STRING_CHARACTERISTIC, ["read"], bytearray(b"VMAT-BASIC-RF")),
+        SimulatedCharacteristic(FIRMWARE_REVISION_STRING_CHARACTERISTIC, ["read"], bytearray(b"1.0.0")),
+        SimulatedCharacteristic(SOFTWARE_REVISION_STRING_CHARACTERISTIC, ["read"], bytearray(b"1.0.0")),
+        SimulatedCharacteristic(MOTOR_COMMAND_CHARACTERISTIC, ["write", "write-without-response"]),
+        SimulatedCharacteristic(FLOOR_LIGHT_CHARACTERISTIC, ["read", "write"], bytearray(b"\x00")),
+        SimulatedCharacteristic(FACTORY_RESET_CHARACTERISTIC, ["write"]),
+        SimulatedCharacteristic(MOTOR_STATUS_CHARACTERISTIC, ["read", "notify"], bytearray(b"\x00")),
+        SimulatedCharacteristic(CHIP_TEMP_CHARACTERISTIC, ["read"], bytearray((30).to_bytes(2, "little"))),
+        SimulatedCharacteristic(SERVICE_IF_CHARACTERISTIC, ["read"], bytearray(b"\x00")),
+    ]
+    return {characteristic.uuid: characteristic for characteristic in characteristics}
+
+
+class SimulatedAdapter:
+    """A Bluetooth adapter shared by several simulated beds.
+
+    It allows `connect_slots` connects at a time, and every ATT operation
+    occupies the radio for `airtime` seconds, so beds on the same adapter
+    slow each other down.
+    """
+
+    def __init__(self, connect_slots: int = 2, airtime: float = 0.0025):
+        self.airtime = airtime
+        self.connect_slots = asyncio.Semaphore(connect_slots)
+        self.__radio = asyncio.Lock()
+
+    async def transmit(self) -> None:
+        async with self.__radio:
+            await asyncio.sleep(self.airtime)
+
+
+class SimulatedServices:
+    """The subset of BleakGATTServiceCollection used by the device code."""
+
+    def __init__(self, characteristics: dict[str, SimulatedCharacteristic]):
+        self.characteristics = characteristics
+
+    def get_characteristic(self, uuid: str) -> SimulatedCharacteristic | None:
+        return self.characteristics.get(uuid)
+
+
+class SimulatedClient:
+    """Stand-in for a connected BleakClient talking to a SimulatedBed."""
+
+    def __init__(self, bed: SimulatedBed, disconnected_callback: Callable[[SimulatedClient], None] | None):
+        self.bed = bed
+        self.services = SimulatedServices(bed.characteristics)
+        self.__disconnected_callback = disconnected_callback
+        self.__connected = True
+        self.__notify_callbacks: dict[str, Callable[[SimulatedCharacteristic, bytearray], None]] = {}
+
+    @property
+    def is_connected(self) -> bool:
+        return self.__connected
+
+    @property
+    def address(self) -> str:
+        return self.bed.address
+
+    def __characteristic(self, characteristic: str | SimulatedCharacteristic) -> SimulatedCharacteristic:
+        uuid = characteristic if isinstance(characteristic, str) else characteristic.uuid
+        if (found := self.bed.characteristics.get(uuid)) is None:
+            raise BleakError(f"Characteristic {uuid} was not found")
+        return found
+
+    async def __transfer(self, round_trip: bool = True) -> bool:
+        """Spend the time of one ATT operation. Returns False if the packet was lost."""
+        if not self.__connected:
+            raise BleakError("Not connected")
+        await self.bed.adapter.transmit()
+        if round_trip:
+            await asyncio.sleep(self.bed.att_latency)
+        if not self.__connected:
+            raise BleakError("Disconnected during the operation")
+        if self.bed.random.random() < self.bed.disconnect_rate:
+            self.drop()
+            raise BleakError("Disconnected during the operation")
+        return self.bed.random.random() >= self.bed.packet_loss
+
+    async def read_gatt_char(self, characteristic: str | SimulatedCharacteristic, **kwargs) -> bytearray:
+        found = self.__characteristic(characteristic)
+        if not await self.__transfer():
+            raise BleakError(f"Read of {found.uuid} was lost")
+        if delay := self.bed.read_delays.get(found.uuid):
+            await asyncio.sleep(delay)
+        self.bed.reads += 1
+        return bytearray(self.bed.read(found.uuid))
+
+    async def write_gatt_char(self, characteristic: str | SimulatedCharacteristic, data: bytes, response: bool = False) -> None:
+        found = self.__characteristic(characteristic)
+        if await self.__transfer(round_trip=response):
+            self.bed.write(found.uuid, bytes(data))
+        elif response:
+            raise BleakError(f"Write to {found.uuid} was lost")
+
+    async def start_notify(self, characteristic: str | SimulatedCharacteristic,
+                           callback: Callable[[SimulatedCharacteristic, bytearray], None], **kwargs) -> None:
+        found = self.__characteristic(characteristic)
+        if not {"notify", "indicate"} & set(found.properties):
+            raise BleakError(f"Characteristic {found.uuid} does not support notifications")
+        await self.__transfer()
+        self.__notify_callbacks[found.uuid] = callback
+
+    async def stop_notify(self, characteristic: str | SimulatedCharacteristic) -> None:
+        self.__notify_callbacks.pop(self.__characteristic(characteristic).uuid, None)
+
+    def notify(self, uuid: str, value: bytes) -> None:
+        if self.__connected and (callback := self.__notify_callbacks.get(uuid)):
+            callback(self.bed.characteristics[uuid], bytearray(value))
+
+    async def disconnect(self) -> bool:
+        if self.__connected:
+            self.__connected = False
+            self.bed.clients.remove(self)
+        return True
+
+    def drop(self) -> None:
+        """Lose the link, as if the bed went out of range."""
+        if not self.__connected:
+            return
+        self.__connected = False
+        self.bed.clients.remove(self)
+        self.bed.drops += 1
+        if self.__disconnected_callback is not None:
+            self.__disconnected_callback(self)
+
+
+class SimulatedBed:
+    """An emulated VMAT-BASIC-RF bed.
+
+    Every write is recorded with its arrival time in `writes`, so the
+    cadence of motor commands can be checked. The motor status reads 1
+    while motor commands keep arriving and is notified when it changes.
+    `read_delays` slows the reads of single characteristics down by the
+    given seconds.
+    """
+    connects: int = 0
+    failed_connects: int = 0
+    reads: int = 0
+    drops: int = 0
+
+    def __init__(self, address: str = "00:00:00:00:00:01", name: str = "Simulated Bed",
+                 adapter: SimulatedAdapter | None = None, connect_latency: float = 0.5,
+                 att_latency: float = 0.03, packet_loss: float = 0.0, disconnect_rate: float = 0.0,
+                 connect_failure_rate: float = 0.0, seed: int | None = None):
+        self.address = address
+        self.name = name
+        self.adapter = adapter or SimulatedAdapter()
+        self.connect_latency = connect_latency
+        self.att_latency = att_latency
+        self.packet_loss = packet_loss
+        self.disconnect_rate = disconnect_rate
+        self.connect_failure_rate = connect_failure_rate
+        self.random = random.Random(seed)
+        self.characteristics = default_gatt_table()
+        self.clients: list[SimulatedClient] = []
+        self.writes: list[SimulatedWrite] = []
+        self.read_delays: dict[str, float] = {}
+        self.__motor_timer: asyncio.TimerHandle | None = None
+
+    @property
+    def ble_device(self) -> BLEDevice:
+        return BLEDevice(self.address, self.name, None)
+
+    async def connect(self, ble_device: BLEDevice, disconnected_callback: Callable[[SimulatedClient], None] | None = None) -> SimulatedClient:
+        """Connect to the bed; usable as `SmartBedConnection.client_factory`."""
+        async with self.adapter.connect_slots:
+            await asyncio.sleep(self.connect_latency)
+        if self.random.random() < self.connect_failure_rate:
+            self.failed_connects += 1
+            raise BleakError(f"{self.address}: connection failed")
+        self.connects += 1
+        client = SimulatedClient(self, disconnected_callback)
+        self.clients.append(client)
+        return client
+
+    def drop_connections(self) -> None:
+        for client in list(self.clients):
+            client.drop()
+
+    def read(self, uuid: str) -> bytes:
+        return bytes(self.characteristics[uuid].value)
+
+    def write(self, uuid: str, data: bytes) -> None:
+        now = time.monotonic()
+        self.writes.append(SimulatedWrite(now, uuid, data))
+        if uuid == MOTOR_COMMAND_CHARACTERISTIC:
+            self.__set_motor_status(1)
+            # The motor stops when the keep-alive writes stop arriving
+            if self.__motor_timer is not None:
+                self.__motor_timer.cancel()
+            self.__motor_timer = asyncio.get_running_loop().call_later(
+                2 * MOTOR_COMMAND_INTERVAL, self.__set_motor_status, 0
+            )
+        elif "read" in self.characteristics[uuid].properties:
+            self.characteristics[uuid].value = bytearray(data)
+
+    def __set_motor_status(self, status: int) -> None:
+        value = bytes([status])
+        if self.characteristics[MOTOR_STATUS_CHARACTERISTIC].value == value:
+            return
+        self.characteristics[MOTOR_STATUS_CHARACTERISTIC].value = bytearray(value)
+        for client in list(self.clients):
+            client.notify(MOTOR_STATUS_CHARACTERISTIC, value)
+
+    def motor_writes(self, since: float = 0.0) -> list[SimulatedWrite]:
+        return [write for write in self.writes if write.uuid == MOTOR_COMMAND_CHARACTERISTIC and write.time >= since]
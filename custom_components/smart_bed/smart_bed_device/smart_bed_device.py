@@ -2,13 +2,16 @@
 
 from __future__ import annotations
 import asyncio
+import time
+from functools import partial
+from itertools import accumulate, zip_longest
 from logging import Logger
+from typing import Callable, Iterable
 from .const import (
     MANUFACTURER_NAME_STRING_CHARACTERISTIC,
     MODEL_NUMBER_STRING_CHARACTERISTIC,
     FIRMWARE_REVISION_STRING_CHARACTERISTIC,
     SOFTWARE_REVISION_STRING_CHARACTERISTIC,
-    MOTOR_COMMAND_CHARACTERISTIC,
     FLOOR_LIGHT_CHARACTERISTIC,
     FACTORY_RESET_CHARACTERISTIC,
     MOTOR_STATUS_CHARACTERISTIC,
@@ -23,10 +26,44 @@ from .const import (
     MOTOR_COMMAND_LEGS_DOWN,
     MOTOR_COMMAND_LEGS_UP,
     MOTOR_COMMAND_LEGS_RANGE_DURATION,
+    MOTOR_BED,
+    MOTOR_HEAD,
+    MOTOR_LEGS,
+    MOTOR_COMMANDS,
+    MOTOR_RANGE_DURATIONS,
+    PRIORITY_BACKGROUND,
+    READ_TIMEOUT,
+    TIMING_READ,
+    TIMING_REFRESH,
+    TIMING_WRITE,
 )
+from .connection import SmartBedConnection
+from .executor import MotorCommandExecutor
+from .health import DeviceHealth
+from .parser import SmartBedAdvertisement
+from .position import MotorPosition
+from .program import MotionProgram, step_duration, wave_program
+from .state import SmartBedReading, SmartBedState
+from .stream import MotorStreamStatistics
+from .timing import OperationTimings
 from bleak import BleakClient
+from bleak.backends.characteristic import BleakGATTCharacteristic
 from bleak.backends.device import BLEDevice
-from bleak_retry_connector import establish_connection
+
+# Static identity characteristics, only re-read when the firmware revision changes
+IDENTITY_CHARACTERISTICS = {
+    MANUFACTURER_NAME_STRING_CHARACTERISTIC: "manufacturer",
+    MODEL_NUMBER_STRING_CHARACTERISTIC: "model",
+    FIRMWARE_REVISION_STRING_CHARACTERISTIC: "fw_version",
+    SOFTWARE_REVISION_STRING_CHARACTERISTIC: "sw_version",
+}
+
+# Volatile state characteristics and the attribute each one is stored in
+STATE_CHARACTERISTICS = {
+    MOTOR_STATUS_CHARACTERISTIC: "motor_status",
+    FLOOR_LIGHT_CHARACTERISTIC: "floor_light",
+    CHIP_TEMP_CHARACTERISTIC: "chip_temp",
+}
 
 
 class SmartBedDevice:
@@ -45,6 +82,12 @@ class SmartBedDevice:
     floor_light: bytearray | None = None
     chip_temp: bytearray | None = None
 
+    advertisement: SmartBedAdvertisement | None = None
+    last_seen: float | None = None
+
+    active_program: str | None = None
+    program_progress: float | None = None
+
 
     def __init__(self, logger: Logger, ble_device: BLEDevice):
         super().__init__()
@@ -53,71 +96,364 @@ class SmartBedDevice:
         self.name = self.__ble_device.name
         self.address = self.__ble_device.address
         self.identifier = self.__ble_device.address
+        self.__connection = SmartBedConnection(logger, ble_device)
+        self.__executor = MotorCommandExecutor(logger, self.__connection)
+        self.__executor.register_callback(self.__track_position)
+        self.__positions = {motor: MotorPosition(duration) for motor, duration in MOTOR_RANGE_DURATIONS.items()}
+        self.__callbacks: list[Callable[[], None]] = []
+        self.__identity_callbacks: list[Callable[[dict[str, str]], None]] = []
+        self.__identity_known: bool = False
+        self.__identity_stale: bool = True
+        self.__notifying: set[str] = set()
+        self.__notify_client: BleakClient | None = None
+        self.__remove_connect_callback: Callable[[], None] | None = None
+        self.__program_run: object | None = None
+        self.__connection.add_connect_callback(self.__mark_identity_stale)
+        self.__connection.add_disconnect_callback(self.__clear_subscriptions)
+
+    @property
+    def connection(self) -> SmartBedConnection:
+        """The pooled connection shared by polling and motor commands."""
+        return self.__connection
+
+    @property
+    def health(self) -> DeviceHealth:
+        """Connection health and circuit breaker of the device."""
+        return self.__connection.health
+
+    @property
+    def timings(self) -> OperationTimings:
+        """Rolling durations of the connects, GATT operations and motor actions."""
+        return self.__connection.timings
+
+    def set_ble_device(self, ble_device: BLEDevice) -> None:
+        self.__ble_device = ble_device
+        self.__connection.set_ble_device(ble_device)
+
+    @property
+    def executor(self) -> MotorCommandExecutor:
+        """The executor that serializes the motor actions of this device."""
+        return self.__executor
+
+    @property
+    def last_move_statistics(self) -> MotorStreamStatistics | None:
+        return self.__executor.last_move_statistics
+
+    async def disconnect(self):
+        await self.__executor.stop()
+        await self.stop_notify()
+        await self.__connection.disconnect()
+
+    def update_from_advertisement(self, advertisement: SmartBedAdvertisement, ble_device: BLEDevice | None = None) -> bool:
+        """Take in an advertisement without connecting. Returns whether anything changed."""
+        self.last_seen = time.monotonic()
+        if ble_device is not None and not self.__connection.is_connected:
+            self.set_ble_device(ble_device)
+        changed = advertisement != self.advertisement
+        self.advertisement = advertisement
+        return changed
+
+    @property
+    def state(self) -> SmartBedState:
+        """Decoded snapshot of the current device state."""
+        return SmartBedState.decode(
+            self.motor_status,
+            self.floor_light,
+            self.chip_temp,
+            self.__executor.active_motors,
+        )
+
+    @property
+    def identity(self) -> dict[str, str]:
+        """The static device information, suitable for persisting."""
+        return {attribute: getattr(self, attribute) for attribute in IDENTITY_CHARACTERISTICS.values()}
+
+    def restore_identity(self, identity: dict[str, str]) -> None:
+        """Use previously persisted device information instead of reading it."""
+        for attribute in IDENTITY_CHARACTERISTICS.values():
+            setattr(self, attribute, identity.get(attribute, ""))
+        self.__identity_known = True
+
+    def register_identity_callback(self, callback: Callable[[dict[str, str]], None]) -> Callable[[], None]:
+        """Call `callback` with the new identity after it was (re-)read from the device."""
+        self.__identity_callbacks.append(callback)
+        return lambda: self.__identity_callbacks.remove(callback)
+
+    async def __read_identity(self, client: BleakClient):
+        for uuid, attribute in IDENTITY_CHARACTERISTICS.items():
+            setattr(self, attribute, (await self.__read(client, uuid)).decode("utf-8"))
+        self.__identity_known = True
+        self.__identity_stale = False
+        for callback in list(self.__identity_callbacks):
+            callback(self.identity)
+
+    async def __read(self, client: BleakClient, uuid: str) -> bytearray:
+        with self.__connection.timings.span(TIMING_READ):
+            return await client.read_gatt_char(uuid)
+
+    async def __mark_identity_stale(self, client: BleakClient):
+        # Checked by the next poll, so a command's connect doesn't wait for it
+        self.__identity_stale = True
+
+    async def __verify_identity(self, client: BleakClient):
+        # One read per connect is enough to notice a firmware update
+        self.__identity_stale = False
+        if self.__identity_known:
+            fw_version = (await self.__read(client, FIRMWARE_REVISION_STRING_CHARACTERISTIC)).decode("utf-8")
+            if fw_version == self.fw_version:
+                return
+            self.logger.debug("%s: firmware changed from %s to %s", self.address, self.fw_version, fw_version)
+        await self.__read_identity(client)
+
+    async def update_device_info(self):
+        """Make sure the static device information is known, connecting if needed."""
+        async with self.__connection.session() as client:
+            if not self.__identity_known:
+                await self.__read_identity(client)
+
+    @property
+    def notifying(self) -> set[str]:
+        """State characteristics currently pushed by the device."""
+        return set(self.__notifying)
+
+    def register_callback(self, callback: Callable[[], None]) -> Callable[[], None]:
+        """Call `callback` whenever pushed state changes. Returns an unsubscribe function."""
+        self.__callbacks.append(callback)
+        return lambda: self.__callbacks.remove(callback)
 
-    async def __connect(self):
-        return await establish_connection(BleakClient, self.__ble_device, self.address)
-    
-    async def __disconnect(self, client):
-        await client.disconnect()
+    def __fire_callbacks(self) -> None:
+        for callback in list(self.__callbacks):
+            callback()
 
-    async def update_device_data(self):
-        """Update the device data."""
-        client = await self.__connect()
+    async def start_notify(self) -> set[str]:
+        """Subscribe to the state characteristics that support notifications.
 
-        # Pair with the device
-        # await client.pair()
+        The connection is held open and the subscriptions are renewed after
+        every reconnect. Returns the characteristics that are now pushed;
+        the rest still have to be polled. If none can be pushed the
+        connection isn't held, and a failed attempt can be repeated.
+        """
+        if self.__remove_connect_callback is not None:
+            return self.notifying
+        client = await self.__connection.hold()
+        try:
+            await self.__subscribe(client)
+        except Exception:
+            self.__clear_subscriptions()
+            self.__connection.unhold()
+            raise
+        if not self.__notifying:
+            self.__connection.unhold()
+            return set()
+        self.__remove_connect_callback = self.__connection.add_connect_callback(self.__subscribe)
+        return self.notifying
 
-        if not client.is_connected:
-            raise Exception("Device is not connected")
+    async def stop_notify(self):
+        if self.__remove_connect_callback is None:
+            return
+        self.__remove_connect_callback()
+        self.__remove_connect_callback = None
+        self.__clear_subscriptions()
+        self.__connection.unhold()
 
-        self.manufacturer = (await client.read_gatt_char(MANUFACTURER_NAME_STRING_CHARACTERISTIC)).decode("utf-8")
-        self.model = (await client.read_gatt_char(MODEL_NUMBER_STRING_CHARACTERISTIC)).decode("utf-8")
-        self.fw_version = (await client.read_gatt_char(FIRMWARE_REVISION_STRING_CHARACTERISTIC)).decode("utf-8")
-        self.sw_version = (await client.read_gatt_char(SOFTWARE_REVISION_STRING_CHARACTERISTIC)).decode("utf-8")
+    def __clear_subscriptions(self) -> None:
+        # Subscriptions end with the link, poll until they are renewed
+        self.__notifying = set()
+        self.__notify_client = None
 
-        self.motor_status = await client.read_gatt_char(MOTOR_STATUS_CHARACTERISTIC)
-        self.floor_light = await client.read_gatt_char(FLOOR_LIGHT_CHARACTERISTIC)
-        self.chip_temp = await client.read_gatt_char(CHIP_TEMP_CHARACTERISTIC)
+    async def __subscribe(self, client: BleakClient):
+        if client is self.__notify_client:
+            return
+        self.__notify_client = client
+        self.__notifying = set()
+        for uuid, attribute in STATE_CHARACTERISTICS.items():
+            characteristic = client.services.get_characteristic(uuid)
+            if characteristic is None or not {"notify", "indicate"} & set(characteristic.properties):
+                continue
+            await client.start_notify(characteristic, partial(self.__handle_notification, attribute))
+            self.__notifying.add(uuid)
+        self.logger.debug("%s: subscribed to %d of %d state characteristics",
+            self.address, len(self.__notifying), len(STATE_CHARACTERISTICS))
 
-        await self.__disconnect(client)
-    
-    async def __send_motor_command(self, command, duration):
-        client = await self.__connect()
+    def __handle_notification(self, attribute: str, _sender: BleakGATTCharacteristic, data: bytearray):
+        setattr(self, attribute, data)
+        self.__fire_callbacks()
 
-        delay: float = 0.1
-        repeat: int = int(duration / delay)
-        for _ in range(repeat):
-            await client.write_gatt_char(MOTOR_COMMAND_CHARACTERISTIC, data=command)
-            await asyncio.sleep(delay)
+    async def update_device_data(self, fields: Iterable[str] | None = None, timeout: float = READ_TIMEOUT) -> SmartBedReading:
+        """Update the volatile device state.
 
-        await self.__disconnect(client)
+        After every new connection the firmware revision is read as well,
+        and the identity re-read when it changed.
+
+        Only the state `fields` (all of them by default) that aren't pushed
+        by notifications are read. The reads are issued together and each
+        one has its own timeout, so a slow characteristic fails alone.
+        """
+        wanted = set(STATE_CHARACTERISTICS.values()) if fields is None else set(fields)
+        uuids = [
+            uuid for uuid, attribute in STATE_CHARACTERISTICS.items()
+            if attribute in wanted and uuid not in self.__notifying
+        ]
+        if not uuids and not self.__identity_stale:
+            return SmartBedReading()
+
+        with self.timings.span(TIMING_REFRESH):
+            async with self.__connection.session(PRIORITY_BACKGROUND) as client:
+                # Pair with the device
+                # await client.pair()
+
+                if not client.is_connected:
+                    raise Exception("Device is not connected")
+
+                if self.__identity_stale:
+                    try:
+                        await asyncio.wait_for(self.__verify_identity(client), timeout)
+                    except Exception as err:
+                        self.__identity_stale = True
+                        self.logger.debug("%s: checking the firmware revision failed: %r", self.address, err)
+                if not uuids:
+                    return SmartBedReading()
+
+                results = await asyncio.gather(
+                    *(asyncio.wait_for(self.__read(client, uuid), timeout) for uuid in uuids),
+                    return_exceptions=True,
+                )
+
+        values = {}
+        failed = set()
+        for uuid, result in zip(uuids, results):
+            attribute = STATE_CHARACTERISTICS[uuid]
+            if isinstance(result, BaseException):
+                self.logger.debug("%s: reading %s failed: %r", self.address, attribute, result)
+                failed.add(attribute)
+                continue
+            setattr(self, attribute, result)
+            values[attribute] = bytes(result)
+        if len(failed) == len(uuids):
+            raise Exception(f"Reading {', '.join(sorted(failed))} failed")
+        return SmartBedReading(**values, failed=frozenset(failed))
+
+    async def set_floor_light(self, level: int):
+        """Set the floor light to `level` percent, 0 switching it off.
+
+        The written value is the floor light state until the next read or
+        notification replaces it, so it isn't read back separately.
+        """
+        value = bytes([min(100, max(0, round(level)))])
+        async with self.__connection.session() as client:
+            with self.timings.span(TIMING_WRITE):
+                await client.write_gatt_char(FLOOR_LIGHT_CHARACTERISTIC, value, response=True)
+        self.floor_light = bytearray(value)
+        self.__fire_callbacks()
+
+    def position(self, motor: str) -> float | None:
+        """Estimated position of `motor` in percent, None if unknown."""
+        return self.__positions[motor].position
+
+    def restore_position(self, motor: str, position: float | None) -> None:
+        self.__positions[motor].position = position
+
+    def set_range_duration(self, motor: str, seconds: float) -> None:
+        """Calibrate how long `motor` takes to travel its whole range."""
+        self.__positions[motor].range_duration = seconds
+
+    def is_moving(self, motor: str, up: bool) -> bool:
+        return MOTOR_COMMANDS[motor][up] in self.__executor.active_commands
+
+    def __track_position(self, command: bytes, elapsed: float | None):
+        if elapsed is not None:
+            for motor, commands in MOTOR_COMMANDS.items():
+                if command in commands:
+                    self.__positions[motor].apply(command == commands[1], elapsed)
+        self.__fire_callbacks()
+
+    async def set_position(self, motor: str, position: float):
+        """Move `motor` to `position` percent in one streamed action."""
+        await self.set_positions({motor: position})
+
+    async def set_positions(self, positions: dict[str, float]):
+        """Move several motors to their positions at the same time.
+
+        The moves of all motors are streamed in parallel over one connection,
+        so this takes as long as the longest single move.
+        """
+        plans = [
+            [(MOTOR_COMMANDS[motor][up], seconds) for up, seconds in self.__positions[motor].plan(position)]
+            for motor, position in positions.items()
+        ]
+        steps = [dict(moves for moves in step if moves) for step in zip_longest(*plans)]
+        if steps:
+            await self.__executor.submit(positions, steps)
+
+    async def move(self, motor: str, up: bool, duration: float | None = None):
+        """Drive `motor` in one direction, through its whole range if no duration is given."""
+        if duration is None:
+            duration = self.__positions[motor].range_duration
+        await self.__move(motor, MOTOR_COMMANDS[motor][up], duration)
+
+    async def __move(self, motor: str, command: bytes, duration: float):
+        await self.__executor.submit({motor}, [{command: duration}])
+
+    async def stop(self):
+        """Stop any moving motor and drop queued motor actions."""
+        await self.__executor.stop()
 
 
     async def down(self, duration=0.2, max=False):
-        await self.__send_motor_command(MOTOR_COMMAND_DOWN, MOTOR_COMMAND_RANGE_DURATION if max else duration)
+        await self.__move(MOTOR_BED, MOTOR_COMMAND_DOWN, MOTOR_COMMAND_RANGE_DURATION if max else duration)
 
 
     async def up(self, duration=0.2, max=False):
-        await self.__send_motor_command(MOTOR_COMMAND_UP, MOTOR_COMMAND_RANGE_DURATION if max else duration)
+        await self.__move(MOTOR_BED, MOTOR_COMMAND_UP, MOTOR_COMMAND_RANGE_DURATION if max else duration)
 
 
     async def head_down(self, duration=0.2, max=False):
-        await self.__send_motor_command(MOTOR_COMMAND_HEAD_DOWN, MOTOR_COMMAND_HEAD_RANGE_DURATION if max else duration)
+        await self.__move(MOTOR_HEAD, MOTOR_COMMAND_HEAD_DOWN, MOTOR_COMMAND_HEAD_RANGE_DURATION if max else duration)
 
 
     async def head_up(self, duration=0.2, max=False):
-        await self.__send_motor_command(MOTOR_COMMAND_HEAD_UP, MOTOR_COMMAND_HEAD_RANGE_DURATION if max else duration)
+        await self.__move(MOTOR_HEAD, MOTOR_COMMAND_HEAD_UP, MOTOR_COMMAND_HEAD_RANGE_DURATION if max else duration)
 
 
     async def legs_down(self, duration=0.2, max=False):
-        await self.__send_motor_command(MOTOR_COMMAND_LEGS_DOWN, MOTOR_COMMAND_LEGS_RANGE_DURATION if max else duration)
+        await self.__move(MOTOR_LEGS, MOTOR_COMMAND_LEGS_DOWN, MOTOR_COMMAND_LEGS_RANGE_DURATION if max else duration)
 
 
     async def legs_up(self, duration=0.2, max=False):
-        await self.__send_motor_command(MOTOR_COMMAND_LEGS_UP, MOTOR_COMMAND_LEGS_RANGE_DURATION if max else duration)
+        await self.__move(MOTOR_LEGS, MOTOR_COMMAND_LEGS_UP, MOTOR_COMMAND_LEGS_RANGE_DURATION if max else duration)
 
 
     async def start_wave(self, repeat=2):
-        for _ in range(repeat):
-            await self.up(max=True)
-            await self.down(max=True)
+        await self.run_program(wave_program(repeat))
+
+    async def run_program(self, program: MotionProgram):
+        """Run `program` as one motor action over one connection.
+
+        The whole program can be stopped or preempted at once. While it runs
+        `active_program` is its name and `program_progress` the scheduled
+        fraction that has started, and callbacks are called as it advances.
+        """
+        steps = program.compile({motor: position.range_duration for motor, position in self.__positions.items()})
+        total = sum(step_duration(step) for step in steps)
+        offsets = list(accumulate((step_duration(step) for step in steps), initial=0.0))
+
+        # A program that preempts this one takes over the shared attributes
+        run = object()
+
+        def _progress(index: int) -> None:
+            if self.__program_run is not run:
+                return
+            self.program_progress = offsets[index] / total if total else 1.0
+            self.__fire_callbacks()
+
+        self.__program_run = run
+        self.active_program = program.name
+        self.program_progress = None
+        try:
+            await self.__executor.submit(program.motors, steps, progress=_progress)
+        finally:
+            if self.__program_run is run:
+                self.__program_run = None
+                self.active_program = None
+                self.program_progress = None
+                self.__fire_callbacks()
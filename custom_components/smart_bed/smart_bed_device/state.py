@@ -0,0 +1,53 @@
+"""State snapshots of the Smart Bed device."""
+
+from __future__ import annotations
+from dataclasses import dataclass
+
+
+@dataclass(frozen=True, slots=True)
+class SmartBedReading:
+    """Raw values of the state characteristics read in one refresh.
+
+    Characteristics that were not requested are None, and the ones that
+    failed or timed out are listed in `failed`.
+    """
+    motor_status: bytes | None = None
+    floor_light: bytes | None = None
+    chip_temp: bytes | None = None
+    failed: frozenset[str] = frozenset()
+
+
+def decode_int(raw: bytes | bytearray | None, signed: bool = False) -> int | None:
+    """Decode a little-endian integer characteristic value."""
+    if not raw:
+        return None
+    return int.from_bytes(raw, "little", signed=signed)
+
+
+@dataclass(frozen=True, slots=True)
+class SmartBedState:
+    """Decoded, immutable state of the device.
+
+    Snapshots compare equal when nothing changed, so consumers can skip
+    redundant updates.
+    """
+    motor_status: int | None = None
+    floor_light: int | None = None
+    chip_temp: float | None = None
+    active_motors: frozenset[str] = frozenset()
+
+    @classmethod
+    def decode(
+            cls,
+            motor_status: bytes | bytearray | None,
+            floor_light: bytes | bytearray | None,
+            chip_temp: bytes | bytearray | None,
+            active_motors: frozenset[str] = frozenset(),
+            ) -> SmartBedState:
+        temperature = decode_int(chip_temp, signed=True)
+        return cls(
+            motor_status=decode_int(motor_status),
+            floor_light=decode_int(floor_light),
+            chip_temp=None if temperature is None else float(temperature),
+            active_motors=active_motors,
+        )
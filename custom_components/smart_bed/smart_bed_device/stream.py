@@ -0,0 +1,112 @@
+"""Motor command streaming for the Smart Bed device."""
+
+from __future__ import annotations
+import asyncio
+import time
+from dataclasses import dataclass
+from .const import MOTOR_COMMAND_CHARACTERISTIC, MOTOR_COMMAND_INTERVAL, TIMING_WRITE
+from .timing import OperationTimings
+from bleak import BleakClient
+
+
+@dataclass
+class MotorStreamStatistics:
+    """Timing statistics of a single streamed move."""
+    writes: int = 0
+    written_ticks: int = 0
+    missed_ticks: int = 0
+    max_jitter: float = 0.0
+    total_jitter: float = 0.0
+    elapsed: float = 0.0
+
+    @property
+    def mean_jitter(self) -> float:
+        return self.total_jitter / self.written_ticks if self.written_ticks else 0.0
+
+    @property
+    def writes_per_second(self) -> float:
+        return self.writes / self.elapsed if self.elapsed else 0.0
+
+    def as_dict(self) -> dict[str, float | int]:
+        return {
+            "writes": self.writes,
+            "missed_ticks": self.missed_ticks,
+            "mean_jitter": self.mean_jitter,
+            "max_jitter": self.max_jitter,
+            "elapsed": self.elapsed,
+            "writes_per_second": self.writes_per_second,
+        }
+
+
+class MotorCommandStream:
+    """Write motor commands at a fixed keep-alive rate, each for its own duration.
+
+    Ticks are scheduled from a monotonic clock, so the write latency doesn't
+    add up over a long move. A tick that is more than one interval late is
+    skipped and counted as missed instead of being written in a burst.
+    Commands for different motors are interleaved within each tick, so they
+    move at the same time. A running stream can be extended, and stops on the
+    next tick when its task is cancelled.
+    """
+
+    def __init__(self, client: BleakClient, commands: dict[bytes, float], interval: float = MOTOR_COMMAND_INTERVAL,
+                 timings: OperationTimings | None = None):
+        self.client = client
+        self.interval = interval
+        self.timings = timings or OperationTimings()
+        self.ticks = {command: self.__ticks(duration) for command, duration in commands.items()}
+        self.tick = 0
+        self.statistics = MotorStreamStatistics()
+
+    def __ticks(self, duration: float) -> int:
+        return max(int(round(duration / self.interval)), 1)
+
+    @property
+    def commands(self) -> list[bytes]:
+        """The commands that are still being written."""
+        return [command for command, ticks in self.ticks.items() if self.tick < ticks]
+
+    def extend(self, command: bytes, duration: float) -> None:
+        """Keep writing `command` for at least `duration` seconds from now."""
+        self.ticks[command] = max(self.ticks.get(command, 0), self.tick + self.__ticks(duration))
+
+    def run_time(self, command: bytes) -> float:
+        """Seconds `command` has been driving its motor."""
+        return min(self.ticks[command] * self.interval, self.statistics.elapsed)
+
+    def __write_response(self) -> bool:
+        # Write-without-response doesn't wait for an ATT round trip per tick
+        characteristic = self.client.services.get_characteristic(MOTOR_COMMAND_CHARACTERISTIC)
+        return characteristic is None or "write-without-response" not in characteristic.properties
+
+    async def run(self) -> MotorStreamStatistics:
+        response = self.__write_response()
+        start = time.monotonic()
+        try:
+            while commands := self.commands:
+                due = start + self.tick * self.interval
+                now = time.monotonic()
+                if now < due:
+                    await asyncio.sleep(due - now)
+                    now = time.monotonic()
+                late = now - due
+                if late >= self.interval:
+                    missed = int(late / self.interval)
+                    self.statistics.missed_ticks += missed
+                    self.tick += missed
+                    continue
+                for command in commands:
+                    with self.timings.span(TIMING_WRITE):
+                        await self.client.write_gatt_char(MOTOR_COMMAND_CHARACTERISTIC, command, response=response)
+                    self.statistics.writes += 1
+                self.statistics.written_ticks += 1
+                self.statistics.total_jitter += late
+                self.statistics.max_jitter = max(self.statistics.max_jitter, late)
+                self.tick += 1
+            # The last write keeps the motor running for one more interval
+            end = start + self.tick * self.interval
+            if (now := time.monotonic()) < end:
+                await asyncio.sleep(end - now)
+        finally:
+            self.statistics.elapsed = time.monotonic() - start
+        return self.statistics
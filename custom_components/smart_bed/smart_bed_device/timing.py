@@ -0,0 +1,78 @@
+"""Timing of the BLE operations of the Smart Bed device."""
+
+from __future__ import annotations
+import time
+from collections import deque
+from contextlib import contextmanager
+from typing import Iterator
+from .const import TIMING_WINDOW
+
+
+class TimingHistogram:
+    """Rolling percentiles over the last `size` durations of one operation."""
+    count: int = 0
+    failures: int = 0
+    last: float | None = None
+
+    def __init__(self, size: int = TIMING_WINDOW):
+        self.__samples: deque[float] = deque(maxlen=size)
+
+    def record(self, seconds: float, failed: bool = False) -> None:
+        self.__samples.append(seconds)
+        self.count += 1
+        self.failures += failed
+        self.last = seconds
+
+    def percentile(self, fraction: float) -> float | None:
+        if not self.__samples:
+            return None
+        ordered = sorted(self.__samples)
+        return ordered[min(int(fraction * len(ordered)), len(ordered) - 1)]
+
+    def as_dict(self) -> dict[str, float | int | None]:
+        return {
+            "count": self.count,
+            "failures": self.failures,
+            "last": self.last,
+            "p50": self.percentile(0.5),
+            "p95": self.percentile(0.95),
+            "p99": self.percentile(0.99),
+            "max": max(self.__samples, default=None),
+        }
+
+
+class OperationTimings:
+    """Timing spans of the operations of one device, by name.
+
+    A span costs two clock reads and a deque append, so it can stay on in
+    production. Only the last `size` durations of each operation are kept.
+    """
+
+    def __init__(self, size: int = TIMING_WINDOW):
+        self.size = size
+        self.__histograms: dict[str, TimingHistogram] = {}
+
+    def histogram(self, name: str) -> TimingHistogram:
+        if (histogram := self.__histograms.get(name)) is None:
+            histogram = self.__histograms[name] = TimingHistogram(self.size)
+        return histogram
+
+    def record(self, name: str, seconds: float, failed: bool = False) -> None:
+        self.histogram(name).record(seconds, failed)
+
+    @contextmanager
+    def span(self, name: str) -> Iterator[None]:
+        """Time the body of the `with` statement as one `name` operation."""
+        start = time.perf_counter()
+        failed = False
+        try:
+            yield
+        except Exception:
+            # A cancelled operation (e.g. a stopped move) didn't fail
+            failed = True
+            raise
+        finally:
+            self.record(name, time.perf_counter() - start, failed)
+
+    def as_dict(self) -> dict[str, dict[str, float | int | None]]:
+        return {name: histogram.as_dict() for name, histogram in self.__histograms.items()}
@@ -0,0 +1,16 @@
+"""Tests of parsing motion programs."""
+
+from __future__ import annotations
+import pytest
+from smart_bed_device import SmartBedProgramError, parse_program
+from smart_bed_device.program import MAX_PROGRAM_STEPS
+
+
+def test_nested_repeat_is_expanded():
+    program = parse_program("x", [{"repeat": 3, "steps": [{"pause": 1}, {"repeat": 2, "steps": [{"pause": 2}]}]}])
+    assert len(program.steps) == 9
+
+
+def test_huge_nested_repeat_is_rejected_before_expanding():
+    with pytest.raises(SmartBedProgramError, match=str(MAX_PROGRAM_STEPS)):
+        parse_program("x", [{"repeat": 50_000_000, "steps": [{"pause": 1}]}])
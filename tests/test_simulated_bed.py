@@ -0,0 +1,194 @@
+"""Tests of the Smart Bed device code against simulated beds.
+
+They need the library installed on its own (`pip install -e .[test]` in the
+repository root) and no Bluetooth hardware. Timing assertions leave a wide
+margin, so they only fail on real latency regressions.
+"""
+
+from __future__ import annotations
+import asyncio
+import time
+from contextlib import asynccontextmanager
+from typing import AsyncIterator
+import pytest
+from smart_bed_device import SmartBedDevice, SmartBedUnavailableError, parse_program
+from smart_bed_device.benchmark import simulated_device
+from smart_bed_device.const import (
+    CHIP_TEMP_CHARACTERISTIC,
+    FLOOR_LIGHT_CHARACTERISTIC,
+    MOTOR_COMMAND_INTERVAL,
+    MOTOR_COMMANDS,
+    MOTOR_HEAD,
+    MOTOR_STATUS_CHARACTERISTIC,
+)
+from smart_bed_device.simulator import SimulatedBed
+
+MARGIN = 0.05
+
+HEAD_UP = MOTOR_COMMANDS[MOTOR_HEAD][True]
+HEAD_DOWN = MOTOR_COMMANDS[MOTOR_HEAD][False]
+
+
+@asynccontextmanager
+async def simulated(connect_latency: float = 0.05, att_latency: float = 0.005) -> AsyncIterator[tuple[SimulatedBed, SmartBedDevice]]:
+    bed = SimulatedBed(connect_latency=connect_latency, att_latency=att_latency, seed=0)
+    device = simulated_device(bed)
+    try:
+        yield bed, device
+    finally:
+        await device.disconnect()
+
+
+async def wait_for_writes(bed: SimulatedBed, count: int = 1) -> None:
+    while len(bed.motor_writes()) < count:
+        await asyncio.sleep(0.01)
+
+
+def test_cadence():
+    async def scenario():
+        async with simulated() as (bed, device):
+            await device.move(MOTOR_HEAD, True, 1.0)
+            arrivals = [write.time for write in bed.motor_writes()]
+            gaps = [later - earlier for earlier, later in zip(arrivals, arrivals[1:])]
+            assert len(arrivals) == pytest.approx(1.0 / MOTOR_COMMAND_INTERVAL, abs=1)
+            assert device.last_move_statistics.missed_ticks == 0
+            assert sum(abs(gap - MOTOR_COMMAND_INTERVAL) for gap in gaps) / len(gaps) < MARGIN / 2
+            assert max(gaps) < MOTOR_COMMAND_INTERVAL + MARGIN
+
+    asyncio.run(scenario())
+
+
+def test_stop_latency():
+    async def scenario():
+        async with simulated() as (bed, device):
+            move = asyncio.ensure_future(device.move(MOTOR_HEAD, True, 5.0))
+            await wait_for_writes(bed, 3)
+            stopped = time.monotonic()
+            await device.stop()
+            await move
+            assert time.monotonic() - stopped < MOTOR_COMMAND_INTERVAL + MARGIN
+            assert not bed.motor_writes(since=stopped + MARGIN)
+            await asyncio.sleep(2 * MOTOR_COMMAND_INTERVAL + MARGIN)
+            assert bed.read(MOTOR_STATUS_CHARACTERISTIC) == b"\x00"
+            assert not device.executor.active_motors
+
+    asyncio.run(scenario())
+
+
+def test_preempt_switches_direction():
+    async def scenario():
+        async with simulated() as (bed, device):
+            up = asyncio.ensure_future(device.move(MOTOR_HEAD, True, 5.0))
+            await wait_for_writes(bed, 3)
+            pressed = time.monotonic()
+            await device.move(MOTOR_HEAD, False, 0.3)
+            await up
+            assert time.monotonic() - pressed < 0.3 + MOTOR_COMMAND_INTERVAL + MARGIN
+            commands = [write.data for write in bed.motor_writes(since=pressed + MARGIN)]
+            assert commands and set(commands) == {HEAD_DOWN}
+            assert bed.connects == 1
+
+    asyncio.run(scenario())
+
+
+def test_merge_extends_running_stream():
+    async def scenario():
+        async with simulated() as (bed, device):
+            first = asyncio.ensure_future(device.move(MOTOR_HEAD, True, 0.5))
+            await wait_for_writes(bed, 3)
+            pressed = time.monotonic()
+            await device.move(MOTOR_HEAD, True, 0.5)
+            assert first.done()
+            arrivals = [write.time for write in bed.motor_writes()]
+            assert {write.data for write in bed.motor_writes()} == {HEAD_UP}
+            assert arrivals[-1] - pressed == pytest.approx(0.5 - MOTOR_COMMAND_INTERVAL, abs=MARGIN + MOTOR_COMMAND_INTERVAL)
+            # One stream that kept going, not a restart
+            assert max(later - earlier for earlier, later in zip(arrivals, arrivals[1:])) < MOTOR_COMMAND_INTERVAL + MARGIN
+            assert bed.connects == 1
+
+    asyncio.run(scenario())
+
+
+def test_merge_while_connecting():
+    async def scenario():
+        async with simulated(connect_latency=0.5) as (bed, device):
+            start = time.monotonic()
+            first = asyncio.ensure_future(device.move(MOTOR_HEAD, True, 0.3))
+            await asyncio.sleep(0.1)
+            await device.move(MOTOR_HEAD, True, 0.3)
+            await first
+            writes = bed.motor_writes()
+            assert writes[0].time - start < 0.5 + MARGIN
+            assert bed.connects == 1
+
+    asyncio.run(scenario())
+
+
+def test_refresh_with_partial_timeout():
+    async def scenario():
+        async with simulated() as (bed, device):
+            bed.read_delays[CHIP_TEMP_CHARACTERISTIC] = 1.0
+            start = time.monotonic()
+            reading = await device.update_device_data(timeout=0.2)
+            assert time.monotonic() - start < 0.05 + 0.2 + MARGIN
+            assert reading.failed == {"chip_temp"}
+            assert reading.motor_status == b"\x00"
+            assert reading.floor_light == b"\x00"
+            assert device.state.chip_temp is None
+
+    asyncio.run(scenario())
+
+
+def test_refresh_fails_when_every_read_times_out():
+    async def scenario():
+        async with simulated() as (bed, device):
+            for uuid in (MOTOR_STATUS_CHARACTERISTIC, FLOOR_LIGHT_CHARACTERISTIC, CHIP_TEMP_CHARACTERISTIC):
+                bed.read_delays[uuid] = 1.0
+            with pytest.raises(Exception, match="failed"):
+                await device.update_device_data(timeout=0.2)
+
+    asyncio.run(scenario())
+
+
+def test_breaker_recovers_when_the_bed_is_back():
+    async def scenario():
+        async with simulated() as (bed, device):
+            device.health.backoff_min = device.health.backoff_max = 0.2
+            bed.connect_failure_rate = 1.0
+            for _ in range(device.health.threshold):
+                with pytest.raises(Exception, match="connection failed"):
+                    await device.update_device_data()
+            assert device.health.is_open
+            with pytest.raises(SmartBedUnavailableError):
+                await device.update_device_data()
+            assert bed.failed_connects == device.health.threshold
+
+            bed.connect_failure_rate = 0.0
+            await asyncio.sleep(0.2)
+            await device.update_device_data()
+            assert not device.health.is_open
+            assert bed.connects == 1
+
+    asyncio.run(scenario())
+
+
+def test_preempting_program_keeps_its_progress():
+    async def scenario():
+        async with simulated() as (bed, device):
+            first = asyncio.ensure_future(device.run_program(
+                parse_program("first", [{"motor": "head", "direction": "up", "duration": 2}])
+            ))
+            await wait_for_writes(bed, 3)
+            second = asyncio.ensure_future(device.run_program(parse_program("second", [
+                {"motor": "head", "direction": "down", "duration": 0.3},
+                {"motor": "head", "direction": "up", "duration": 0.3},
+            ])))
+            await first
+            await asyncio.sleep(0.4)
+            assert device.active_program == "second"
+            assert device.program_progress == pytest.approx(0.5)
+            await second
+            assert device.active_program is None
+            assert device.program_progress is None
+
+    asyncio.run(scenario())